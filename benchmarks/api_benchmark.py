@@ -0,0 +1,188 @@
+"""
+Latency, queries per request and throughput of the schoolstudents API.
+
+Drives the endpoints in-process through the Django test client, e.g.
+`python -m benchmarks.api_benchmark --students 10000 --output before.json`
+and, after a change, `python -m benchmarks.api_benchmark --students 10000
+--compare before.json`. The write scenarios run inside a transaction which
+is rolled back afterwards, so the seeded data set stays the same between runs.
+The response cache is off, or cleared before every request when
+`RESPONSE_CACHE_ENABLED` is set, unless `--cache` is given.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+
+from benchmarks.utils import seed
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment
+
+from schoolstudents.models import School, Student
+
+
+def percentile(timings, percent):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    index = max(int(round(percent / 100 * len(timings) + 0.5)) - 1, 0)
+    return timings[min(index, len(timings) - 1)]
+
+
+def build_scenarios(school, students):
+    """
+    (name, method, path builder, payload builder) for every benchmarked endpoint.
+    """
+    def student(i):
+        return students[i % len(students)]
+
+    def new_student(i):
+        return {
+            'first_name': f'Bench{i}', 'last_name': 'Marker', 'age': '10.0',
+            'nationality': 'Bangladeshi', 'school': school.pk,
+        }
+
+    return [
+        ('schools_list', 'get', lambda i: '/api/schools/', None),
+        ('school_detail', 'get', lambda i: f'/api/schools/{school.pk}/', None),
+        ('students_list', 'get', lambda i: '/api/students/', None),
+        ('students_list_deep_page', 'get', lambda i: '/api/students/?page=20', None),
+        ('students_cursor', 'get', lambda i: '/api/students/?pagination=cursor&ordering=last_name', None),
+        ('students_ordering_age', 'get', lambda i: '/api/students/?ordering=-age', None),
+        ('students_ordering_school', 'get', lambda i: '/api/students/?ordering=school__name', None),
+        ('students_search', 'get', lambda i: '/api/students/?search=mar', None),
+        ('full_text_search', 'get', lambda i: '/api/search/?type=students&q=mar', None),
+        ('school_students', 'get', lambda i: f'/api/schools/{school.pk}/students/', None),
+        ('school_stats', 'get', lambda i: f'/api/schools/{school.pk}/stats/', None),
+        ('schools_stats', 'get', lambda i: '/api/schools/stats/', None),
+        ('student_detail', 'get', lambda i: f'/api/students/{student(i)}/', None),
+        ('student_create', 'post', lambda i: '/api/students/', new_student),
+        ('student_update', 'patch', lambda i: f'/api/students/{student(i)}/', lambda i: {'last_name': f'Marker{i}'}),
+    ]
+
+
+def run_scenario(client, method, path, payload, requests, warmup, cache):
+    """
+    Time `requests` sequential calls; queries are counted on the first warm-up call.
+    """
+    request = getattr(client, method)
+
+    def call(i):
+        if not cache:
+            caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        data = payload(i) if payload else None
+        started = time.perf_counter()
+        response = request(path(i), data=data, content_type='application/json') if data else request(path(i))
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method.upper()} {path(i)} returned {response.status_code}: {response.content[:200]}')
+        return elapsed
+
+    # `connection.queries` is reset on every request, count through a wrapper instead.
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        call(0)
+    for i in range(1, warmup):
+        call(i)
+
+    timings = sorted(call(warmup + i) for i in range(requests))
+    total = sum(timings)
+    return {
+        'requests': requests,
+        'queries': len(queries),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(total / requests * 1000, 3),
+        'throughput_rps': round(requests / total, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['scenarios']
+    print(f'\n{"scenario":<26}{"p50 ms":>20}{"p95 ms":>20}{"queries":>12}')
+    for name, result in report['scenarios'].items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        columns = []
+        for key in ('p50_ms', 'p95_ms'):
+            change = (result[key] - before[key]) / before[key] * 100 if before[key] else 0
+            columns.append(f'{before[key]:.1f}->{result[key]:.1f} ({change:+.0f}%)')
+        print(f'{name:<26}{columns[0]:>20}{columns[1]:>20}{before["queries"]:>6}->{result["queries"]:<5}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--schools', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=100, help='Timed requests per scenario.')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--scenario', action='append', help='Only run these scenarios.')
+    parser.add_argument('--cache', action='store_true', help='Keep the response cache between requests.')
+    parser.add_argument('--without-middleware', action='append', default=[], metavar='PATH',
+                        help='Run without this middleware, e.g. to measure its overhead.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Print the change against an earlier JSON result.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    print(f'Seeding {args.students} students on {connection.vendor}')
+    seed(args.students, args.schools)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'vendor': connection.vendor,
+            'students': Student.objects.count(),
+            'schools': School.objects.count(),
+            'requests': args.requests,
+            'cache': args.cache,
+            'without_middleware': args.without_middleware,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'scenarios': {},
+    }
+    middleware = [name for name in settings.MIDDLEWARE if name not in args.without_middleware]
+    client = Client()
+    cache_enabled = args.cache or settings.RESPONSE_CACHE_ENABLED
+    with override_settings(MIDDLEWARE=middleware, RESPONSE_CACHE_ENABLED=cache_enabled), transaction.atomic():
+        school = School.objects.order_by('pk').first()
+        # Make room for the created students, rolled back with the rest.
+        School.objects.filter(pk=school.pk).update(max_students=F('max_students') + args.requests + args.warmup)
+        students = list(Student.objects.order_by('pk').values_list('pk', flat=True)[:args.requests + args.warmup])
+
+        for name, method, path, payload in build_scenarios(school, students):
+            if args.scenario and name not in args.scenario:
+                continue
+            result = run_scenario(client, method, path, payload, args.requests, args.warmup, args.cache)
+            report['scenarios'][name] = result
+            print(f'{name:<26} p50 {result["p50_ms"]:>8} ms  p95 {result["p95_ms"]:>8} ms  '
+                  f'p99 {result["p99_ms"]:>8} ms  {result["queries"]:>3} queries  {result["throughput_rps"]:>8} req/s')
+        transaction.set_rollback(True)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Concurrent-request throughput of the ASGI entry point against the WSGI one.
+
+Both applications run in-process: the WSGI one in `--wsgi-threads` threads
+(1 is a sync worker), the ASGI one with `--concurrency` requests in flight
+on one event loop. `--db-latency-ms` adds a delay to every query to stand in
+for the network round trip to PostgreSQL, e.g.
+`python -m benchmarks.asgi_benchmark --concurrency 50 --db-latency-ms 2`.
+The response cache is replaced by a dummy one so every request queries.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import seed, wsgi_get
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings
+
+from schoolstudents.models import School
+from schoolstudents.query_hooks import watch_queries
+
+
+def delay_queries(latency):
+    def delayed(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+    return delayed
+
+
+def run_wsgi(paths, threads, latency):
+    application = get_wsgi_application()
+
+    def call(path):
+        with watch_queries(delay_queries(latency)):
+            return wsgi_get(application, path)
+
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(call, paths))
+
+
+def run_asgi(paths, concurrency, latency):
+    with override_settings(ROOT_URLCONF='manatal_challenge.asgi_urls'):
+        application = get_asgi_application()
+
+        async def call(path, semaphore):
+            path, _, query = path.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+                'root_path': '', 'headers': [(b'host', b'localhost')], 'server': ('localhost', 80),
+            }
+            messages, finished = [], asyncio.Event()
+            requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+            async def receive():
+                if requests:
+                    return requests.pop()
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                messages.append(message)
+                if message['type'] == 'http.response.body' and not message.get('more_body'):
+                    finished.set()
+
+            async with semaphore:
+                await application(scope, receive, send)
+            return messages[0]['status'], b''.join(message.get('body', b'') for message in messages[1:])
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            with watch_queries(delay_queries(latency)):
+                return await asyncio.gather(*(call(path, semaphore) for path in paths))
+
+        return asyncio.run(main())
+
+
+def measure(name, run, paths):
+    started = time.perf_counter()
+    responses = run(paths)
+    elapsed = time.perf_counter() - started
+    failed = [status for status, _ in responses if not str(status).startswith('200')]
+    if failed:
+        raise RuntimeError(f'{name}: {len(failed)} failed requests, e.g. {failed[0]}')
+    return {'requests': len(paths), 'seconds': round(elapsed, 3), 'throughput_rps': round(len(paths) / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--schools', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--wsgi-threads', type=int, default=1)
+    parser.add_argument('--db-latency-ms', type=float, default=0.0)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    print(f'Seeding {args.students} students on {connections["default"].vendor}')
+    seed(args.students, args.schools)
+    school_pks = list(School.objects.order_by('pk').values_list('pk', flat=True))
+    paths = []
+    for i in range(args.requests):
+        school_pk = school_pks[i % len(school_pks)]
+        paths.append([
+            '/api/students/?ordering=-age',
+            f'/api/schools/{school_pk}/',
+            f'/api/schools/{school_pk}/students/',
+        ][i % 3])
+
+    caches = {**settings.CACHES, settings.RESPONSE_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    latency = args.db_latency_ms / 1000
+    with override_settings(CACHES=caches):
+        report = {
+            'db_latency_ms': args.db_latency_ms,
+            'wsgi': measure('wsgi', lambda paths: run_wsgi(paths, args.wsgi_threads, latency), paths),
+            'asgi': measure('asgi', lambda paths: run_asgi(paths, args.concurrency, latency), paths),
+        }
+    print(f'WSGI ({args.wsgi_threads} threads)    {report["wsgi"]["throughput_rps"]:>8} req/s')
+    print(f'ASGI ({args.concurrency} in flight) {report["asgi"]["throughput_rps"]:>8} req/s')
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Per-request cost of opening database connections.
+
+Sends the same requests to the WSGI application without connection reuse
+(`DB_CONN_MAX_AGE=0`), with persistent connections and with the connection
+pool (`DB_POOL=True`), each in a fresh process configured through the
+environment like a deployment, e.g.
+`DB_ENGINE=django.db.backends.sqlite3 DB_NAME=db.sqlite3 python -m benchmarks.connection_benchmark`.
+The response cache is disabled so every request queries.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODES = {
+    'no_reuse': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'False'},
+    'pool': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'True'},
+}
+
+
+def measure(requests):
+    from benchmarks.utils import wsgi_get
+
+    from django.core.wsgi import get_wsgi_application
+    from django.db.backends.signals import connection_created
+
+    from schoolstudents.db.pool import pools
+    from schoolstudents.models import School
+
+    opened = []
+    connection_created.connect(lambda sender, **kwargs: opened.append(sender), weak=False)
+    application = get_wsgi_application()
+    school_pks = list(School.objects.order_by('pk').values_list('pk', flat=True)[:100])
+    paths = [f'/api/schools/{school_pks[i % len(school_pks)]}/' for i in range(requests)]
+    opened.clear()
+    created = sum(pool.stats()['created'] for pool in pools.values())
+
+    timings = []
+    for path in paths:
+        started = time.perf_counter()
+        status, _ = wsgi_get(application, path)
+        timings.append(time.perf_counter() - started)
+        if not status.startswith('200'):
+            raise RuntimeError(f'{path} returned {status}')
+    timings.sort()
+    if pools:
+        # Django connects on every checkout, only count the connections the pool opened.
+        opened = range(sum(pool.stats()['created'] for pool in pools.values()) - created)
+    return {
+        'requests': requests,
+        'connections_opened': len(opened),
+        'p50_ms': round(timings[len(timings) // 2] * 1000, 3),
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+        'pool': {alias: pool.stats() for alias, pool in pools.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--schools', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import benchmarks.utils  # noqa: F401  (sets Django up)
+        print(json.dumps(measure(args.requests)))
+        return
+
+    from benchmarks.utils import seed
+    from django.db import connection
+    print(f'Seeding {args.students} students on {connection.vendor}')
+    seed(args.students, args.schools)
+
+    report = {}
+    for mode, env in MODES.items():
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.connection_benchmark', '--child', '--requests', str(args.requests)],
+            env={**os.environ, **env, 'CACHE_BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            check=True, stdout=subprocess.PIPE,
+        ).stdout
+        report[mode] = json.loads(output.decode().strip().splitlines()[-1])
+        print(f'{mode:<12} p50 {report[mode]["p50_ms"]:>7} ms  mean {report[mode]["mean_ms"]:>7} ms  '
+              f'{report[mode]["connections_opened"]:>5} connections opened')
+    overhead = report['no_reuse']['mean_ms'] - report['pool']['mean_ms']
+    print(f'Connection overhead per request: {overhead:.3f} ms')
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Concurrent enrollment into one school: `--requests` student creates sent
+from `--threads` threads at a school with `--capacity` seats. Reports the
+throughput, latency and status codes, and fails if the school ends up over
+capacity, e.g.
+`python -m benchmarks.enrollment_benchmark --requests 500 --threads 50`.
+Run it on PostgreSQL; SQLite serializes every write on the database file.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.api_benchmark import percentile
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment
+
+from schoolstudents.models import School, Student
+
+
+def enroll(school, requests, threads):
+    """
+    (status code, seconds) of each of the `requests` concurrent creates.
+    """
+    def create(number):
+        data = {
+            'first_name': f'Stress{number}', 'last_name': 'Test', 'age': '10.0',
+            'nationality': 'Thai', 'school': school.pk,
+        }
+        started = time.perf_counter()
+        try:
+            status_code = Client().post('/api/students/', data, content_type='application/json').status_code
+        finally:
+            connection.close()
+        return status_code, time.perf_counter() - started
+
+    with ThreadPoolExecutor(threads) as executor:
+        return list(executor.map(create, range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--capacity', type=int, default=100)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # Every create over capacity is logged as a bad request otherwise.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    school = School.objects.create(name='Stress test', city='Dhaka', country='Bangladesh', max_students=args.capacity)
+    caches = {**settings.CACHES, settings.RESPONSE_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    try:
+        with override_settings(CACHES=caches):
+            started = time.perf_counter()
+            results = enroll(school, args.requests, args.threads)
+            elapsed = time.perf_counter() - started
+        school.refresh_from_db()
+        enrolled = Student.objects.filter(school=school).count()
+    finally:
+        school.delete()
+
+    latencies = sorted(seconds for _, seconds in results)
+    report = {
+        'vendor': connections['default'].vendor,
+        'requests': args.requests,
+        'threads': args.threads,
+        'capacity': args.capacity,
+        'statuses': {str(code): count for code, count in sorted(Counter(code for code, _ in results).items())},
+        'enrolled': enrolled,
+        'student_count': school.student_count,
+        'throughput_rps': round(args.requests / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    if not enrolled == school.student_count <= args.capacity:
+        sys.exit(f'Capacity broken: {enrolled} students, counter {school.student_count}, {args.capacity} seats.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Search latency before/after the indexes of migration 0003.
+
+Run from the project folder, e.g. `python -m benchmarks.search_benchmark --students 1000000`.
+The "before" run drops the trigram indexes inside a transaction which is
+rolled back afterwards, so it only makes a difference on PostgreSQL.
+"""
+import argparse
+import importlib
+import json
+import statistics
+import time
+
+from benchmarks.utils import seed
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from schoolstudents.models import Student
+
+
+SEARCH_TERMS = ['hul', 'mar', 'ranka', 'zuwen', 'tor ber', 'xyz']
+
+
+def search_queryset(term):
+    conditions = Q()
+    for word in term.split():
+        conditions &= Q(first_name__icontains=word) | Q(last_name__icontains=word)
+    return Student.objects.filter(conditions)
+
+
+def measure(repeat):
+    results = {}
+    for term in SEARCH_TERMS:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = search_queryset(term)
+            queryset.count()
+            list(queryset.order_by('id')[:25])
+            timings.append((time.perf_counter() - started) * 1000)
+        results[term] = {
+            'p50_ms': round(statistics.median(timings), 3),
+            'max_ms': round(max(timings), 3),
+        }
+    return results
+
+
+def measure_without_trigram_indexes(repeat):
+    trigram = importlib.import_module('schoolstudents.migrations.0003_student_indexes')
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name, _, _ in trigram.TRIGRAM_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+        results = measure(repeat)
+        transaction.set_rollback(True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=1000000)
+    parser.add_argument('--schools', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    print(f'Seeding {args.students} students on {connection.vendor}')
+    seed(args.students, args.schools)
+
+    report = {
+        'vendor': connection.vendor,
+        'students': Student.objects.count(),
+        'before': measure_without_trigram_indexes(args.repeat) if connection.vendor == 'postgresql' else None,
+        'after': measure(args.repeat),
+    }
+    for term in SEARCH_TERMS:
+        before = report['before'][term]['p50_ms'] if report['before'] else '-'
+        print(f'{term!r:>12}  before p50 {before} ms  after p50 {report["after"][term]["p50_ms"]} ms')
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Rows/sec of the student and school list serialization paths.
+
+Compares `ModelSerializer(many=True)` + `JSONRenderer` with the
+`.values()` + `FastJSONRenderer` path used by the list endpoints on
+already fetched rows, e.g.
+`python -m benchmarks.serializer_benchmark --rows 25 --rows 1000`.
+"""
+import argparse
+import time
+
+from benchmarks.utils import seed
+
+from rest_framework.renderers import JSONRenderer
+
+from schoolstudents.models import School, Student
+from schoolstudents.renderers import FastJSONRenderer
+from schoolstudents.serializers import SchoolSerializer, StudentSerializer
+from schoolstudents.views import SchoolModelViewSet, StudentModelViewSet
+
+
+def rows_per_second(serialize, rows, min_seconds):
+    runs, started = 0, time.perf_counter()
+    while True:
+        serialize()
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return rows * runs / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, action='append', help='Page sizes to measure (repeatable).')
+    parser.add_argument('--seconds', type=float, default=1.0, help='Minimum time per measurement.')
+    args = parser.parse_args()
+    page_sizes = args.rows or [25, 1000]
+
+    seed(max(page_sizes), max(1, max(page_sizes) // 100))
+    targets = (
+        ('students', Student.objects.order_by('pk'), StudentSerializer, StudentModelViewSet.values_serializer),
+        ('schools', School.objects.order_by('pk'), SchoolSerializer, SchoolModelViewSet.values_serializer),
+    )
+    for name, queryset, serializer_class, values_serializer in targets:
+        for rows in page_sizes:
+            # Fetch once, only serialization and rendering are measured.
+            instances = list(queryset[:rows])
+            values = list(values_serializer.values(queryset[:rows]))
+            rows = len(instances)
+
+            def drf():
+                JSONRenderer().render(serializer_class(instances, many=True).data)
+
+            def fast():
+                FastJSONRenderer().render(values_serializer.to_representation(values))
+
+            drf_rate = rows_per_second(drf, rows, args.seconds)
+            fast_rate = rows_per_second(fast, rows, args.seconds)
+            print(f'{name:>8} {rows:>6} rows  serializer {drf_rate:>10.0f} rows/s  '
+                  f'values {fast_rate:>10.0f} rows/s  x{fast_rate / drf_rate:.1f}')
+
+
+if __name__ == '__main__':
+    main()
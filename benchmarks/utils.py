@@ -0,0 +1,76 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import io
+import os
+import random
+
+# Set Django Module
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manatal_challenge.settings')
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.db.models import Count
+
+from schoolstudents.models import School, Student
+
+
+SYLLABLES = ['an', 'ber', 'cha', 'del', 'ek', 'fio', 'gar', 'hul', 'is', 'jo', 'ka', 'lum',
+             'mar', 'nor', 'os', 'pe', 'qui', 'ran', 'sa', 'tor', 'ul', 'vic', 'wen', 'zu']
+
+
+def fake_name(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def seed(total_students, total_schools, batch_size=10000, seed_value=0):
+    """
+    Top the students table up to `total_students` rows with bulk inserts.
+    """
+    rng = random.Random(seed_value)
+    missing = total_students - Student.objects.count()
+    if missing <= 0:
+        return
+    per_school = -(-total_students // total_schools)
+    schools = list(School.objects.all()[:total_schools])
+    schools += School.objects.bulk_create([
+        School(name=fake_name(rng)[:20], city='Dhaka', country='Bangladesh', max_students=per_school)
+        for _ in range(total_schools - len(schools))
+    ])
+    School.objects.filter(max_students__lt=per_school).update(max_students=per_school)
+    schools = list(School.objects.annotate(enrolled=Count('students')).order_by('pk')[:total_schools])
+
+    # Round-robin over the free seats, a random school would overfill some.
+    seats = [
+        school for turn in range(per_school) for school in schools
+        if school.enrolled + turn < school.max_students
+    ][:missing]
+    for start in range(0, len(seats), batch_size):
+        Student.objects.bulk_create([
+            Student(
+                school=school,
+                first_name=fake_name(rng),
+                last_name=fake_name(rng),
+                age=round(rng.uniform(4, 15.5), 1),
+                nationality=fake_name(rng),
+            )
+            for school in seats[start:start + batch_size]
+        ])
+    call_command('reconcile_student_counts', stdout=io.StringIO())
+
+
+def wsgi_get(application, path):
+    """
+    (status, body) of a GET request sent straight to a WSGI `application`.
+    """
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+    }
+    statuses = []
+    body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    return statuses[0], body
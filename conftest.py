@@ -15,4 +15,16 @@ def enable_db_access_for_all_tests(db):
 
 def pytest_configure():
     settings.DEBUG = False
+    # Fail any request repeating a query shape, see schoolstudents.query_detector.
+    settings.QUERY_DETECTOR_STRICT = True
     django.setup()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    The database is rolled back after every test, so the caches must be too.
+    """
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
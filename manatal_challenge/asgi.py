@@ -0,0 +1,19 @@
+"""
+ASGI config for manatal_challenge project.
+
+It exposes the ASGI callable as a module-level variable named ``application``,
+serving the school and student reads with async views, e.g.
+`uvicorn manatal_challenge.asgi:application --workers 4`.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/stable/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manatal_challenge.settings')
+os.environ.setdefault('ROOT_URLCONF', 'manatal_challenge.asgi_urls')
+
+application = get_asgi_application()
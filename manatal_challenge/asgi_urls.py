@@ -0,0 +1,14 @@
+"""manatal_challenge URL Configuration of the ASGI entry point
+
+Same routes as `manatal_challenge.urls`, the school and student reads being
+served by async views.
+"""
+
+from django.conf.urls import include
+from django.contrib import admin
+from django.urls import path
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('api/', include(('schoolstudents.async_urls', 'schoolstudents'), namespace='schoolstudents')),
+]
@@ -39,10 +39,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'django_extensions',
     'rest_framework',
-    'schoolstudents',
+    'schoolstudents.apps.SchoolstudentsConfig',
 ]
 
 MIDDLEWARE = [
+    # Outermost, so the timings cover the other middlewares too.
+    'schoolstudents.middleware.QueryTimingMiddleware',
+    'schoolstudents.query_detector.QueryDetectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,7 +55,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'manatal_challenge.urls'
+ROOT_URLCONF = os.environ.get('ROOT_URLCONF', 'manatal_challenge.urls')
 
 TEMPLATES = [
     {
@@ -76,16 +79,61 @@ WSGI_APPLICATION = 'manatal_challenge.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Connections persist for DB_CONN_MAX_AGE seconds; with DB_POOL=True they are
+# checked out of an in-process pool instead (see schoolstudents.db.pool).
+DATABASE_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.postgresql')
+POOLED_DATABASE_ENGINES = {
+    'django.db.backends.postgresql': 'schoolstudents.db.backends.postgresql',
+    'django.db.backends.postgresql_psycopg2': 'schoolstudents.db.backends.postgresql',
+    'django.db.backends.sqlite3': 'schoolstudents.db.backends.sqlite3',
+}
+DATABASE_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
-        'NAME': 'manatal_school',
+        'ENGINE': POOLED_DATABASE_ENGINES[DATABASE_ENGINE] if DATABASE_POOL else DATABASE_ENGINE,
+        'NAME': os.environ.get('DB_NAME', 'manatal_school'),
         'USER': os.environ.get('POSTGRES_USER'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
-        'HOST': 'localhost',
-        'PORT': '',
+        'HOST': os.environ.get('DB_HOST', 'localhost'),
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0 if DATABASE_POOL else 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 0)),
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'CHECK': os.environ.get('DB_POOL_CHECK', 'True') == 'True',
+        },
     }
 }
+if DATABASE_ENGINE == 'django.db.backends.sqlite3':
+    # Take the write lock when the transaction starts, so concurrent writers
+    # wait for each other instead of failing with "database is locked".
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+
+# Read replicas, e.g. DB_REPLICA_HOSTS=replica1,replica2 (or DB_REPLICA_NAMES
+# for SQLite files), serve the school and student reads; see schoolstudents.db.router.
+DATABASE_REPLICAS = []
+replica_hosts = [host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host]
+replica_names = [name for name in os.environ.get('DB_REPLICA_NAMES', '').split(',') if name]
+for index in range(max(len(replica_hosts), len(replica_names))):
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = dict(
+        DATABASES['default'],
+        HOST=replica_hosts[index] if index < len(replica_hosts) else DATABASES['default']['HOST'],
+        NAME=replica_names[index] if index < len(replica_names) else DATABASES['default']['NAME'],
+        TEST={'MIRROR': 'default'},
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['schoolstudents.db.router.ReplicaRouter']
+DATABASE_REPLICA_SELECTION = os.environ.get('DB_REPLICA_SELECTION', 'round_robin')
+DATABASE_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', 5))
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_LAG_CHECK_INTERVAL', 10))
+DATABASE_PRIMARY_PIN_SECONDS = int(os.environ.get('DB_PRIMARY_PIN_SECONDS', 5))
 
 
 # Password validation
@@ -131,3 +179,43 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 25
 }
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# School students settings
+BULK_ENROLLMENT_BATCH_SIZE = int(os.environ.get('BULK_ENROLLMENT_BATCH_SIZE', 500))
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+# Milliseconds a write waits for the row lock of a school before a 409.
+SCHOOL_LOCK_TIMEOUT = int(os.environ.get('SCHOOL_LOCK_TIMEOUT', 2000))
+# Largest page of api/changes/, longest long-poll `wait` and how often it polls, in seconds.
+CHANGE_FEED_PAGE_SIZE = int(os.environ.get('CHANGE_FEED_PAGE_SIZE', 500))
+CHANGE_FEED_MAX_WAIT = float(os.environ.get('CHANGE_FEED_MAX_WAIT', 30))
+CHANGE_FEED_POLL_INTERVAL = float(os.environ.get('CHANGE_FEED_POLL_INTERVAL', 0.5))
+# Long-poll in the WSGI view too, holding a worker per waiting client; ASGI always does.
+CHANGE_FEED_SYNC_LONG_POLL = os.environ.get('CHANGE_FEED_SYNC_LONG_POLL', 'False') == 'True'
+# Seconds the responses of requests sent with an Idempotency-Key are replayed.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+RESPONSE_CACHE_ALIAS = 'default'
+# Writes invalidate cached responses through the cache itself, so it must be
+# shared by every process (Redis, Memcached): off with the per-process default.
+RESPONSE_CACHE_ENABLED = os.environ.get(
+    'RESPONSE_CACHE_ENABLED', str(not CACHES[RESPONSE_CACHE_ALIAS]['BACKEND'].endswith('LocMemCache'))
+) == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+QUERY_DETECTOR_SAMPLE_RATE = float(os.environ.get('QUERY_DETECTOR_SAMPLE_RATE', 0.01))
+QUERY_DETECTOR_SLOW_MS = float(os.environ.get('QUERY_DETECTOR_SLOW_MS', 100))
+QUERY_DETECTOR_REPEAT_THRESHOLD = int(os.environ.get('QUERY_DETECTOR_REPEAT_THRESHOLD', 5))
+QUERY_DETECTOR_STRICT = os.environ.get('QUERY_DETECTOR_STRICT', 'False') == 'True'
+# api/_metrics/ requires `Authorization: Bearer <METRICS_TOKEN>` when set, else
+# a direct connection from METRICS_ALLOWED_IPS (behind a proxy, every request
+# comes from the proxy's address: set a token or do not route the path).
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
@@ -1,6 +1,5 @@
+import argparse
 import os
-import random
-from faker import Faker
 
 # Set Django Module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manatal_challenge.settings')
@@ -8,52 +7,27 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'manatal_challenge.settings')
 import django
 django.setup()
 
-from django.core.exceptions import ValidationError
-from schoolstudents.models import School, Student
+from django.core.management import call_command
 
 
-fake_generator = Faker()
-schools = ["St. Gregory's School", "St. Joseph School", "Scholastica School",
-    "Green Herald School", "St. Francis School", "Ideal Boys School"
-]
-
-def create_school() -> School:
+def populate(students=100, schools=6, workers=1, seed=None):
     """
-    Create school with fake data
+    Create fake schools and students. Rows are generated by `workers`
+    processes and written in bulk by this one, see `import_students`.
     """
-    school, created = School.objects.get_or_create(
-        name=random.choice(schools),
-        defaults={
-            "city": fake_generator.city(),
-            "country": fake_generator.country(),
-            "max_students": random.randint(5,20),
-            "address": fake_generator.address()
-        }
+    call_command(
+        'import_students', synthetic=students, schools=schools, workers=workers, seed=seed
     )
 
-    return school
-
-def populate(iterations=100):
-    for entry in range(iterations):
-
-        school = create_school()
-
-        try:
-            Student.objects.get_or_create(
-                first_name=fake_generator.first_name(), 
-                last_name=fake_generator.last_name(),
-                defaults={
-                    'address': fake_generator.address(),
-                    'age': round(random.uniform(4,15.5), 1),
-                    'nationality': fake_generator.country(),
-                    'school': school
-                }
-            )
-        except ValidationError as ex:
-            print(ex)
-
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Populate data with faker library.')
+    parser.add_argument('--students', type=int, default=100)
+    parser.add_argument('--schools', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, help='Same seed, same data, whatever the workers.')
+    args = parser.parse_args()
+
     print('Started: Data population')
-    populate(iterations=100)
-    print('End')
\ No newline at end of file
+    populate(students=args.students, schools=args.schools, workers=args.workers, seed=args.seed)
+    print('End')
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SchoolstudentsConfig(AppConfig):
     name = 'schoolstudents'
+
+    def ready(self):
+        from schoolstudents import signals  # noqa: F401
@@ -0,0 +1,28 @@
+from django.urls import path, include, re_path
+
+from schoolstudents import urls, views
+from schoolstudents.async_views import as_async_view, as_change_feed_view
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+LOOKUP = r'[^/.]+'
+
+# The read routes of the routers served by async views, in front of the
+# regular routes which keep the URL names and the other actions.
+urlpatterns = [
+    re_path(r'^schools/$', as_async_view(
+        views.SchoolModelViewSet, LIST_ACTIONS, basename='schools', detail=False)),
+    # Leave `schools/stats/` to the list route of the router.
+    re_path(rf'^schools/(?!stats/$)(?P<pk>{LOOKUP})/$', as_async_view(
+        views.SchoolModelViewSet, DETAIL_ACTIONS, basename='schools', detail=True)),
+    re_path(r'^students/$', as_async_view(
+        views.StudentModelViewSet, LIST_ACTIONS, basename='students', detail=False)),
+    re_path(rf'^students/(?P<pk>{LOOKUP})/$', as_async_view(
+        views.StudentModelViewSet, DETAIL_ACTIONS, basename='students', detail=True)),
+    re_path(rf'^schools/(?P<school_pk>{LOOKUP})/students/$', as_async_view(
+        views.StudentModelViewSet, LIST_ACTIONS, basename='school-students', detail=False)),
+    re_path(rf'^schools/(?P<school_pk>{LOOKUP})/students/(?P<pk>{LOOKUP})/$', as_async_view(
+        views.StudentModelViewSet, DETAIL_ACTIONS, basename='school-students', detail=True)),
+    re_path(r'^changes/$', as_change_feed_view(views.ChangeFeedViewSet, basename='changes')),
+    path('', include(urls.urlpatterns)),
+]
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from schoolstudents.metrics import timed_serialization
+from schoolstudents.query_detector import polling
+from schoolstudents.renderers import FastJSONRenderer
+from schoolstudents.services.change_feed import parse_feed_params, read_changes
+
+
+# Native async ORM calls from Django 4.1, `sync_to_async` before.
+async def count_rows(queryset)->int:
+    if hasattr(queryset, 'acount'):
+        return await queryset.acount()
+    return await sync_to_async(queryset.count)()
+
+
+async def fetch_rows(queryset)->list:
+    if hasattr(queryset, 'aiterator'):
+        return [row async for row in queryset]
+    return await sync_to_async(list)(queryset)
+
+
+async def get_row(queryset, **lookup):
+    if hasattr(queryset, 'aget'):
+        return await queryset.aget(**lookup)
+    return await sync_to_async(queryset.get)(**lookup)
+
+
+async def list_response(viewset):
+    """
+    `ValuesListMixin.list` with page number pagination, querying asynchronously.
+    """
+    request = viewset.request
+    values_serializer = viewset.get_values_serializer()
+    rows = values_serializer.values(viewset.filter_queryset(viewset.get_queryset()))
+    paginator = viewset.paginator
+    page_size = paginator.get_page_size(request) if paginator is not None else None
+    if not page_size:
+        rows = await fetch_rows(rows)
+        with timed_serialization():
+            return Response(values_serializer.to_representation(rows))
+
+    django_paginator = paginator.django_paginator_class(rows, page_size)
+    # Paginator.count is a cached property, fill it so it is not queried synchronously.
+    django_paginator.__dict__['count'] = await count_rows(rows)
+    page_number = paginator.get_page_number(request, django_paginator)
+    try:
+        paginator.page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    paginator.request = request
+
+    rows = await fetch_rows(paginator.page.object_list)
+    with timed_serialization():
+        return paginator.get_paginated_response(values_serializer.to_representation(rows))
+
+
+async def retrieve_response(viewset):
+    """
+    `RetrieveModelMixin.retrieve`, querying asynchronously, with the ETag of
+    `ConditionalUpdateMixin.get_etag` if the viewset has one.
+    """
+    queryset = viewset.filter_queryset(viewset.get_queryset())
+    lookup_url_kwarg = viewset.lookup_url_kwarg or viewset.lookup_field
+    try:
+        instance = await get_row(queryset, **{viewset.lookup_field: viewset.kwargs[lookup_url_kwarg]})
+    except (ObjectDoesNotExist, TypeError, ValueError, DjangoValidationError):
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+    viewset.check_object_permissions(viewset.request, instance)
+    with timed_serialization():
+        response = Response(viewset.get_serializer(instance).data)
+    if hasattr(viewset, 'get_etag'):
+        response['ETag'] = viewset.get_etag(instance)
+    return response
+
+
+READ_ACTIONS = {'list': list_response, 'retrieve': retrieve_response}
+
+
+def as_async_view(viewset_class, actions, **initkwargs):
+    """
+    An async view serving the `GET` action of `actions` natively, for the
+    ASGI entry point.
+
+    Authentication, permissions, content negotiation and the response cache
+    run in one `sync_to_async` call, the queries through the async ORM.
+    Other methods, cursor pagination and the browsable API are handed to
+    the regular `viewset_class` in a thread.
+    """
+    sync_view = sync_to_async(viewset_class.as_view(actions, **initkwargs))
+    database_context = getattr(viewset_class, 'database_context', lambda request: nullcontext())
+    read_response = READ_ACTIONS[actions['get']]
+
+    def prepare(request, args, kwargs):
+        """
+        (viewset, response, cache key, etag); no viewset when the request
+        needs the regular view, a response when it is already answered.
+        """
+        viewset = viewset_class(**initkwargs)
+        viewset.action_map = actions
+        for method, action in actions.items():
+            setattr(viewset, method, getattr(viewset, action))
+        viewset.args, viewset.kwargs = args, kwargs
+        viewset.request = request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.headers = viewset.default_response_headers
+        key = etag = None
+        try:
+            viewset.initial(request)
+            if not isinstance(request.accepted_renderer, FastJSONRenderer):
+                return None, None, None, None
+            if viewset.action == 'list' and not isinstance(viewset.paginator, (PageNumberPagination, type(None))):
+                return None, None, None, None
+            if hasattr(viewset, 'cache_lookup') and settings.RESPONSE_CACHE_ENABLED:
+                key, etag, response = viewset.cache_lookup(request)
+                return viewset, response, key, etag
+        except Exception as exc:
+            return viewset, viewset.handle_exception(exc), None, None
+        return viewset, None, key, etag
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await sync_view(request, *args, **kwargs)
+        with database_context(request):
+            viewset, response, key, etag = await sync_to_async(prepare)(request, args, kwargs)
+            if viewset is None:
+                return await sync_view(request, *args, **kwargs)
+
+            if response is None:
+                try:
+                    response = await read_response(viewset)
+                except Exception as exc:
+                    response = viewset.handle_exception(exc)
+                else:
+                    if key is not None:
+                        response = await sync_to_async(viewset.cache_store)(key, etag, response)
+
+        with timed_serialization():
+            response = viewset.finalize_response(viewset.request, response, *args, **kwargs)
+            response.render()
+        # A plain response, the async handler would render a DRF one again in a thread.
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    view.csrf_exempt = True
+    return view
+
+
+def as_change_feed_view(viewset_class, **initkwargs):
+    """
+    An async view long-polling the change feed for the ASGI entry point,
+    sleeping between polls without holding a thread. Requests which do not
+    wait, are invalid or do not ask for JSON go to the regular view.
+    """
+    sync_view = sync_to_async(viewset_class.as_view({'get': 'list'}, **initkwargs))
+
+    async def view(request, *args, **kwargs):
+        try:
+            since, limit, wait = parse_feed_params(request.GET)
+        except ValidationError:
+            return await sync_view(request, *args, **kwargs)
+        if request.method != 'GET' or not wait or 'text/html' in request.headers.get('Accept', ''):
+            return await sync_view(request, *args, **kwargs)
+
+        deadline = time.monotonic() + wait
+        page = await sync_to_async(read_changes)(since, limit)
+        with polling():
+            while not page['changes'] and time.monotonic() < deadline:
+                await asyncio.sleep(min(settings.CHANGE_FEED_POLL_INTERVAL, deadline - time.monotonic()))
+                page = await sync_to_async(read_changes)(since, limit)
+        return HttpResponse(FastJSONRenderer().render(page), content_type=FastJSONRenderer.media_type)
+
+    view.csrf_exempt = True
+    return view
@@ -0,0 +1,170 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from schoolstudents import metrics
+from schoolstudents.db.router import current_replica
+
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def cache_stats()->dict:
+    """
+    Hits, misses and 304 responses served by this process.
+    """
+    with _stats_lock:
+        return {event: _stats[event] for event in ('hit', 'miss', 'not_modified')}
+
+
+@metrics.register
+def cache_metrics()->list:
+    lines = [
+        '# HELP schoolstudents_response_cache_total Responses served through the response cache.',
+        '# TYPE schoolstudents_response_cache_total counter',
+    ]
+    for event, count in cache_stats().items():
+        lines.append(f'schoolstudents_response_cache_total{{result="{event}"}} {count}')
+    return lines
+
+
+def version_key(scope)->str:
+    return f'response-cache:version:{scope}'
+
+
+def bumped_key(scope)->str:
+    return f'response-cache:bumped:{scope}'
+
+
+def get_versions(scopes)->list:
+    cache = get_cache()
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock so an evicted version never repeats.
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """
+    Invalidate every cached response depending on one of `scopes` once the
+    current transaction commits. With replicas the scopes are also marked
+    as written for `DATABASE_PRIMARY_PIN_SECONDS`, see `recently_bumped`.
+    """
+    def bump():
+        cache = get_cache()
+        for scope in set(scopes):
+            try:
+                cache.incr(version_key(scope))
+            except ValueError:
+                cache.add(version_key(scope), int(time.time() * 1000), None)
+        if settings.DATABASE_REPLICAS:
+            cache.set_many({bumped_key(scope): True for scope in scopes}, settings.DATABASE_PRIMARY_PIN_SECONDS)
+
+    transaction.on_commit(bump)
+
+
+def recently_bumped(scopes)->bool:
+    """
+    Whether one of `scopes` was written while the replicas may still lag
+    behind, the writer being pinned to the primary.
+    """
+    return bool(get_cache().get_many([bumped_key(scope) for scope in scopes]))
+
+
+class ResponseCacheMixin:
+    """
+    Cache `list` and `retrieve` responses keyed by the view, its URL
+    kwargs, the query string and the versions of `get_cache_scopes()`.
+    Writes call `bump_versions` so only the affected scopes are refreshed.
+
+    Only with `RESPONSE_CACHE_ENABLED`, the cache being shared by every
+    process. A replica read of a scope written during the primary pin
+    window may miss the write and is not stored.
+
+    Every cached response carries an ETag, the one set by the view (e.g.
+    a version) or a hash of the key; a matching `If-None-Match` is
+    answered with 304 before touching the database or the serializer.
+    """
+    def get_cache_scopes(self)->list:
+        raise NotImplementedError('`get_cache_scopes()` must be implemented.')
+
+    def get_cache_fingerprint(self, request)->str:
+        scopes = self.get_cache_scopes()
+        parts = [
+            self.basename, self.action,
+            repr(sorted(self.kwargs.items())),
+            repr(sorted(request.query_params.lists())),
+            repr(get_versions(scopes)),
+        ]
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    def cache_lookup(self, request):
+        """
+        (key, etag, response) of `request`, the response being the 304 or
+        the cached one and None on a miss.
+        """
+        fingerprint = self.get_cache_fingerprint(request)
+        key, etag = f'response-cache:response:{fingerprint}', f'"{fingerprint}"'
+
+        cached = get_cache().get(key)
+        if cached is None:
+            record('miss')
+            return key, etag, None
+        etag, data = cached
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            record('not_modified')
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            record('hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+        response['ETag'] = etag
+        return key, etag, response
+
+    def cache_store(self, key, etag, response):
+        etag = response.get('ETag', etag)
+        stale = current_replica.get() is not None and recently_bumped(self.get_cache_scopes())
+        if response.status_code == status.HTTP_200_OK and not stale:
+            get_cache().set(key, (etag, response.data), settings.RESPONSE_CACHE_TIMEOUT)
+            if etag in parse_etags(self.request.META.get('HTTP_IF_NONE_MATCH', '')):
+                record('not_modified')
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['X-Cache'] = 'MISS'
+        response['ETag'] = etag
+        return response
+
+    def cached_response(self, view, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return view(request, *args, **kwargs)
+        key, etag, response = self.cache_lookup(request)
+        if response is None:
+            response = self.cache_store(key, etag, view(request, *args, **kwargs))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
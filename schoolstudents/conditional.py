@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from schoolstudents.db.locks import bounded_lock_wait
+from schoolstudents.models import Change
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The object was changed since it was read, read it again.'
+    default_code = 'precondition_failed'
+
+
+def version_etag(version)->str:
+    return f'"{version}"'
+
+
+def if_match_versions(request):
+    """
+    The versions accepted by the `If-Match` header, None without one or
+    with `*`. An ETag which is not a version can never match.
+    """
+    header = request.headers.get('If-Match', '')
+    if not header.strip():
+        return None
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return None
+    versions = {int(etag[1:-1]) for etag in etags if etag[1:-1].isdigit()}
+    if not versions:
+        raise PreconditionFailed()
+    return versions
+
+
+class ConditionalUpdateMixin:
+    """
+    Optimistic concurrency on the `version` column: detail responses carry
+    it as their ETag and updates sent with `If-Match` fail with 412 when
+    the object was written since.
+
+    Partial updates of `plain_update_fields` only, which have no side
+    effect on other rows, are one conditional `UPDATE ... WHERE version`
+    without reading or locking the row first. Other updates lock the row,
+    check its version and go through `locked_update()`.
+    """
+    plain_update_fields = ()
+
+    def get_etag(self, instance)->str:
+        return version_etag(instance.version)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': self.get_etag(instance)})
+
+    def update(self, request, *args, **kwargs):
+        versions = if_match_versions(request)
+        plain = isinstance(request.data, dict) and request.data.keys() <= set(self.plain_update_fields)
+        if kwargs.get('partial', False) and plain:
+            return self.conditional_update(request, versions)
+        with transaction.atomic():
+            if versions is not None:
+                self.lock_version(versions)
+            response = self.locked_update(request, *args, **kwargs)
+        if 'version' in response.data:
+            response['ETag'] = version_etag(response.data['version'])
+        return response
+
+    def object_lookup(self)->dict:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    def lock_version(self, versions):
+        """
+        Hold the row until the end of the transaction, if it has one of `versions`.
+        """
+        with bounded_lock_wait():
+            version = self.get_queryset().select_related(None).select_for_update().filter(
+                **self.object_lookup()
+            ).values_list('version', flat=True).first()
+        if version is None:
+            raise Http404
+        if version not in versions:
+            raise PreconditionFailed()
+
+    def locked_update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    def conditional_update(self, request, versions):
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.get_queryset().filter(**self.object_lookup())
+        with transaction.atomic():
+            matched = queryset if versions is None else queryset.filter(version__in=versions)
+            if not matched.update(**serializer.validated_data, version=F('version') + 1):
+                if versions is not None and queryset.exists():
+                    raise PreconditionFailed()
+                raise Http404
+            instance = self.get_object()
+            Change.objects.record(Change.UPDATE, [instance])
+            self.perform_conditional_update(instance)
+        return Response(self.get_serializer(instance).data, headers={'ETag': self.get_etag(instance)})
+
+    def perform_conditional_update(self, instance):
+        pass
@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+# SQLSTATE of PostgreSQL's lock_timeout.
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+class LockTimeout(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The school is being updated by another request, try again.'
+    default_code = 'lock_timeout'
+
+
+def is_lock_timeout(exc)->bool:
+    cause = exc.__cause__
+    sqlstate = getattr(cause, 'pgcode', None) or getattr(cause, 'sqlstate', None)
+    return sqlstate == LOCK_NOT_AVAILABLE or 'database is locked' in str(exc)
+
+
+@contextmanager
+def bounded_lock_wait(using=DEFAULT_DB_ALIAS):
+    """
+    Wait at most `SCHOOL_LOCK_TIMEOUT` milliseconds for the row locks taken
+    in the block, then raise `LockTimeout` (409). On PostgreSQL the bound
+    holds until the end of the transaction, which must be open. SQLite
+    locks the whole database and waits for its `timeout` option instead.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('lock_timeout', %s, true)", [f'{settings.SCHOOL_LOCK_TIMEOUT}ms'])
+    try:
+        yield
+    except OperationalError as exc:
+        if is_lock_timeout(exc):
+            raise LockTimeout() from exc
+        raise
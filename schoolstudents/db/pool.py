@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import Counter, deque
+
+from schoolstudents import metrics
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of raw DB-API connections.
+
+    Connections are opened on demand up to `max_size`; a checkout waits up
+    to `timeout` seconds for one to be checked in once they are all in use.
+    Idle connections beyond `min_size` are closed after `max_idle` seconds,
+    and `check(connection)` is run on every reused connection so a broken
+    one is replaced instead of handed out.
+    """
+    def __init__(self, alias, min_size=0, max_size=10, max_idle=300, timeout=10, check=None):
+        self.alias = alias
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check = check
+        self.idle = deque()
+        self.size = 0
+        self.in_use = 0
+        self.events = Counter()
+        self.condition = threading.Condition()
+
+    def checkout(self, connect):
+        """
+        An idle connection, or a new one from `connect()` when none is idle.
+        """
+        started = time.monotonic()
+        waited = False
+        with self.condition:
+            expired = self.expire()
+            while not self.idle and self.size >= self.max_size:
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self.events['timeout'] += 1
+                    raise PoolTimeout(
+                        f'No connection of pool "{self.alias}" was free after {self.timeout} seconds.')
+                waited = True
+                self.condition.wait(remaining)
+            connection = self.idle.pop()[0] if self.idle else None
+            if connection is None:
+                self.size += 1
+            self.in_use += 1
+            self.events['checkout'] += 1
+            if waited:
+                self.events['wait'] += 1
+        close_all(expired)
+        wait_duration.observe((self.alias,), time.monotonic() - started)
+
+        if connection is not None and self.check is not None and not self.check(connection):
+            close_all([connection])
+            self.record('closed')
+            connection = None
+        if connection is None:
+            try:
+                connection = connect()
+            except Exception:
+                with self.condition:
+                    self.in_use -= 1
+                self.release()
+                raise
+            self.record('created')
+        return connection
+
+    def checkin(self, connection, discard=False):
+        with self.condition:
+            self.in_use -= 1
+            if not discard:
+                self.idle.append((connection, time.monotonic()))
+                self.condition.notify()
+                return
+        close_all([connection])
+        self.record('closed')
+        self.release()
+
+    def record(self, event):
+        with self.condition:
+            self.events[event] += 1
+
+    def release(self):
+        """
+        Give the slot of a connection which was closed or never opened back.
+        """
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def expire(self)->list:
+        """
+        Remove the connections idle for longer than `max_idle` beyond
+        `min_size`; the caller holds the lock and closes them.
+        """
+        expired = []
+        deadline = time.monotonic() - self.max_idle
+        while self.idle and self.size > self.min_size and self.idle[0][1] < deadline:
+            expired.append(self.idle.popleft()[0])
+            self.size -= 1
+            self.events['closed'] += 1
+        return expired
+
+    def close(self):
+        with self.condition:
+            connections = [connection for connection, _ in self.idle]
+            self.size -= len(connections)
+            self.events['closed'] += len(connections)
+            self.idle.clear()
+        close_all(connections)
+
+    def stats(self)->dict:
+        with self.condition:
+            return {
+                'size': self.size, 'idle': len(self.idle), 'in_use': self.in_use,
+                **{event: self.events[event] for event in ('checkout', 'created', 'closed', 'wait', 'timeout')},
+            }
+
+
+def close_all(connections):
+    for connection in connections:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def is_usable(connection)->bool:
+    try:
+        cursor = connection.cursor()
+        cursor.execute('SELECT 1')
+        cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, options)->ConnectionPool:
+    """
+    The pool of the `alias` connection, configured by its `POOL` setting.
+    """
+    pool = pools.get(alias)
+    if pool is None:
+        with pools_lock:
+            pool = pools.get(alias)
+            if pool is None:
+                pool = pools[alias] = ConnectionPool(
+                    alias,
+                    min_size=options.get('MIN_SIZE', 0),
+                    max_size=options.get('MAX_SIZE', 10),
+                    max_idle=options.get('MAX_IDLE', 300),
+                    timeout=options.get('TIMEOUT', 10),
+                    check=is_usable if options.get('CHECK', True) else None,
+                )
+    return pool
+
+
+wait_duration = metrics.Histogram(
+    'schoolstudents_db_pool_wait_seconds', 'Time spent checking a connection out of the pool.',
+    ('alias',), metrics.DURATION_BUCKETS)
+
+
+@metrics.register
+def pool_metrics()->list:
+    lines = wait_duration.expose()
+    lines.append('# HELP schoolstudents_db_pool_connections Connections of the pool by state.')
+    lines.append('# TYPE schoolstudents_db_pool_connections gauge')
+    stats = {alias: pool.stats() for alias, pool in sorted(pools.items())}
+    for alias, values in stats.items():
+        for state in ('idle', 'in_use'):
+            lines.append(f'schoolstudents_db_pool_connections{{alias="{alias}",state="{state}"}} {values[state]}')
+    lines.append('# HELP schoolstudents_db_pool_events_total Checkouts, opened and closed connections, '
+                 'waits and timeouts of the pool.')
+    lines.append('# TYPE schoolstudents_db_pool_events_total counter')
+    for alias, values in stats.items():
+        for event in ('checkout', 'created', 'closed', 'wait', 'timeout'):
+            lines.append(f'schoolstudents_db_pool_events_total{{alias="{alias}",event="{event}"}} {values[event]}')
+    return lines
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Check connections out of the process-wide pool of the alias instead of
+    opening them, and back in instead of closing them.
+    """
+    @property
+    def pool(self)->ConnectionPool:
+        return get_pool(self.alias, self.settings_dict.get('POOL') or {})
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.pool.checkout(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is None:
+            return
+        discard = False
+        try:
+            # Never hand out a connection in the middle of a transaction.
+            self.connection.rollback()
+        except Exception:
+            discard = True
+        self.pool.checkin(self.connection, discard=discard)
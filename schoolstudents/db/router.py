@@ -0,0 +1,232 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from schoolstudents import metrics
+
+
+current_replica = contextvars.ContextVar('current_replica', default=None)
+
+
+def replica_lag(alias)->float:
+    """
+    Seconds the `alias` replica is behind the primary, 0 when it has replayed everything.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+            'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+        )
+        return float(cursor.fetchone()[0])
+
+
+class ReplicaSet:
+    """
+    Pick the replica of `DATABASE_REPLICAS` serving a request, round-robin
+    or least loaded (`DATABASE_REPLICA_SELECTION`), skipping the ones lagging
+    more than `DATABASE_REPLICA_MAX_LAG` seconds or marked with `mark_lagging`.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.turn = 0
+            self.in_flight = Counter()
+            self.lagging = set()
+            self.checked_at = time.monotonic()
+
+    def mark_lagging(self, alias, lagging=True):
+        with self.lock:
+            if lagging:
+                self.lagging.add(alias)
+            else:
+                self.lagging.discard(alias)
+
+    def refresh_lag(self):
+        """
+        Check the lag of every replica, at most every `DATABASE_REPLICA_LAG_CHECK_INTERVAL` seconds.
+        """
+        interval = settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL
+        with self.lock:
+            if not interval or time.monotonic() - self.checked_at < interval:
+                return
+            self.checked_at = time.monotonic()
+        for alias in settings.DATABASE_REPLICAS:
+            try:
+                lagging = replica_lag(alias) > settings.DATABASE_REPLICA_MAX_LAG
+            except Exception:
+                lagging = True
+            self.mark_lagging(alias, lagging)
+
+    def choose(self):
+        """
+        The alias of the replica to read from, None for the primary.
+        """
+        if not settings.DATABASE_REPLICAS:
+            return None
+        self.refresh_lag()
+        with self.lock:
+            healthy = [alias for alias in settings.DATABASE_REPLICAS if alias not in self.lagging]
+            if not healthy:
+                return None
+            self.turn += 1
+            # Rotate first, so least loaded ties are spread round-robin too.
+            start = self.turn % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+            if settings.DATABASE_REPLICA_SELECTION == 'least_loaded':
+                return min(healthy, key=lambda alias: self.in_flight[alias])
+            return healthy[0]
+
+    def acquire(self, alias):
+        with self.lock:
+            self.in_flight[alias] += 1
+
+    def release(self, alias):
+        with self.lock:
+            self.in_flight[alias] -= 1
+
+
+replicas = ReplicaSet()
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Route the reads of the block to one replica, or the primary if none is healthy.
+    """
+    alias = replicas.choose()
+    if alias is None:
+        with use_primary():
+            yield None
+        return
+    token = current_replica.set(alias)
+    replicas.acquire(alias)
+    try:
+        yield alias
+    finally:
+        replicas.release(alias)
+        current_replica.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Route the reads of the block to the primary.
+    """
+    token = current_replica.set(None)
+    try:
+        yield
+    finally:
+        current_replica.reset(token)
+
+
+def routed_stream(alias, content):
+    """
+    Iterate a streamed response body with its reads routed to `alias`, the
+    primary when None, counting the replica in flight until it is closed.
+
+    The body runs after `dispatch` has returned, out of its routing block.
+    """
+    iterator = iter(content)
+    if alias is not None:
+        replicas.acquire(alias)
+    try:
+        while True:
+            token = current_replica.set(alias)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                current_replica.reset(token)
+            yield chunk
+    finally:
+        if alias is not None:
+            replicas.release(alias)
+
+
+class ReplicaRouter:
+    """
+    Send the reads of the schoolstudents app to the replica chosen for the
+    current request by `read_from_replica`, everything else to the primary.
+    """
+    app_label = 'schoolstudents'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return current_replica.get() or DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from a read replica. A successful write pins the
+    client to the primary for `DATABASE_PRIMARY_PIN_SECONDS` through a
+    cookie, so it reads its own writes.
+    """
+    primary_pin_cookie = 'db_primary_until'
+
+    @classmethod
+    def database_context(cls, request):
+        pinned_until = request.COOKIES.get(cls.primary_pin_cookie, '')
+        try:
+            pinned = float(pinned_until) > time.time()
+        except ValueError:
+            pinned = False
+        if request.method not in SAFE_METHODS or pinned:
+            return use_primary()
+        return read_from_replica()
+
+    def dispatch(self, request, *args, **kwargs):
+        with self.database_context(request) as alias:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.streaming:
+            response.streaming_content = routed_stream(alias, response.streaming_content)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and settings.DATABASE_REPLICAS:
+            seconds = settings.DATABASE_PRIMARY_PIN_SECONDS
+            response.set_cookie(self.primary_pin_cookie, f'{time.time() + seconds:.3f}', max_age=seconds, httponly=True)
+        return response
+
+
+@metrics.register
+def replica_metrics()->list:
+    lines = [
+        '# HELP schoolstudents_db_replica_in_flight Requests currently reading from the replica.',
+        '# TYPE schoolstudents_db_replica_in_flight gauge',
+    ]
+    with replicas.lock:
+        in_flight, lagging = dict(replicas.in_flight), set(replicas.lagging)
+    for alias in settings.DATABASE_REPLICAS:
+        lines.append(f'schoolstudents_db_replica_in_flight{{alias="{alias}"}} {in_flight.get(alias, 0)}')
+    lines.append('# HELP schoolstudents_db_replica_lagging Whether the replica is skipped for lagging.')
+    lines.append('# TYPE schoolstudents_db_replica_lagging gauge')
+    for alias in settings.DATABASE_REPLICAS:
+        lines.append(f'schoolstudents_db_replica_lagging{{alias="{alias}"}} {int(alias in lagging)}')
+    return lines
@@ -0,0 +1,82 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, models
+from rest_framework import filters
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    `SearchFilter` whose lookups can be answered from an index.
+
+    Text fields keep the default `icontains`, which PostgreSQL serves from
+    the pg_trgm GIN indexes on `UPPER(field::text)` created in migration
+    0003; on other databases (e.g. SQLite for local tests) it is a plain
+    scan as before. Numeric fields are only compared, exactly, with terms
+    that parse as numbers instead of casting every row to text.
+    """
+    numeric_fields = (models.IntegerField, models.DecimalField, models.FloatField)
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        text_lookups, numeric_fields = [], []
+        for search_field in map(str, search_fields):
+            field = self.get_model_field(queryset.model, search_field)
+            if isinstance(field, self.numeric_fields):
+                numeric_fields.append(field)
+            else:
+                text_lookups.append(self.construct_lookup(search_field))
+
+        conditions = []
+        for term in search_terms:
+            lookups = [models.Q(**{lookup: term}) for lookup in text_lookups]
+            for field in numeric_fields:
+                try:
+                    lookups.append(models.Q(**{field.name: field.to_python(term)}))
+                except ValidationError:
+                    continue
+            if not lookups:
+                return queryset.none()
+            conditions.append(reduce(operator.or_, lookups))
+        return queryset.filter(reduce(operator.and_, conditions))
+
+    def construct_lookup(self, search_field):
+        lookup = self.lookup_prefixes.get(search_field[0])
+        if lookup:
+            return f'{search_field[1:]}__{lookup}'
+        return f'{search_field}__{self.default_lookup}'
+
+    def get_model_field(self, model, search_field):
+        try:
+            return model._meta.get_field(search_field)
+        except FieldDoesNotExist:
+            return None
+
+
+class FullTextSearchFilter(IndexedSearchFilter):
+    """
+    Rank rows by the trigger-maintained `search_vector` column on PostgreSQL
+    (`?q=`), falling back to `IndexedSearchFilter` over the view's
+    `search_fields` on other databases.
+    """
+    search_param = 'q'
+    search_config = 'simple'
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        query = SearchQuery(' '.join(terms), config=self.search_config)
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(models.F('search_vector'), query)
+        ).order_by('-rank', 'pk')
@@ -0,0 +1,100 @@
+import functools
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from schoolstudents.models import IdempotencyKey
+
+
+def expired_keys():
+    return IdempotencyKey.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    )
+
+
+def claim_key(key, fingerprint)->IdempotencyKey:
+    """
+    The stored `key`, or a new one without a response when it is not
+    stored yet. Inserting the key waits for a concurrent request holding
+    the same key to finish, so duplicates run one after the other.
+    """
+    expired_keys().filter(key=key).delete()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(key=key, fingerprint=fingerprint)
+    except IntegrityError:
+        return IdempotencyKey.objects.select_for_update().get(key=key)
+
+
+def idempotent(view):
+    """
+    Make a viewset action idempotent, see `IdempotencyMixin`.
+    """
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        return self.idempotent_response(functools.partial(view, self), request, *args, **kwargs)
+    return wrapper
+
+
+class IdempotencyMixin:
+    """
+    Replay the first response of `create` for the retries sent with the
+    same `Idempotency-Key` header, instead of creating the student again.
+
+    The key is stored in the transaction of the create, so the response is
+    stored if and only if the create is committed; server errors and the
+    `retryable_status_codes` (a lock timeout) store nothing and the request
+    can be retried. The query string is part of the request, a retry with
+    other parameters is another request. Keys expire after
+    `IDEMPOTENCY_KEY_TTL` seconds, `manage.py purge_idempotency_keys`
+    deletes them.
+    """
+    idempotency_header = 'Idempotency-Key'
+    retryable_status_codes = (
+        status.HTTP_408_REQUEST_TIMEOUT, status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+
+    def idempotent_response(self, view, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header, None)
+        if key is None:
+            return view(request, *args, **kwargs)
+        if not key or len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            raise ValidationError({self.idempotency_header: ['Expected 1 to 255 characters.']})
+        fingerprint = hashlib.sha256(
+            b'\n'.join([request.method.encode(), request.get_full_path().encode(), request.body])
+        ).hexdigest()
+
+        with transaction.atomic():
+            stored = claim_key(key, fingerprint)
+            if stored.fingerprint != fingerprint:
+                return Response(
+                    {'detail': f'{self.idempotency_header} was already used for another request.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if stored.status_code is not None:
+                response = Response(stored.response, status=stored.status_code)
+                response['Idempotent-Replayed'] = 'true'
+                return response
+
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception as exc:
+                # Client errors are stored too; anything else is raised again.
+                response = self.handle_exception(exc)
+            if (response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+                    or response.status_code in self.retryable_status_codes):
+                transaction.set_rollback(True)
+                return response
+            IdempotencyKey.objects.filter(pk=stored.pk).update(
+                status_code=response.status_code, response=response.data
+            )
+        return response
+
+    def create(self, request, *args, **kwargs):
+        return self.idempotent_response(super().create, request, *args, **kwargs)
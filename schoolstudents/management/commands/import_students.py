@@ -0,0 +1,185 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from schoolstudents.cache import bump_versions
+from schoolstudents.models import Change, School, Student
+from schoolstudents.services.student_enrollment import bulk_enroll_students
+from schoolstudents.services.synthetic_data import generate_rows
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+
+STUDENT_FIELDS = ('first_name', 'last_name', 'age', 'nationality', 'address')
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def read_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream students from a CSV/NDJSON file (or synthetic data) into the database in chunks, '
+        'resolving schools by name and enforcing max_students.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?',
+            help='CSV or NDJSON file, "-" for stdin. Columns: school, first_name, last_name, age, '
+                 'nationality, address and, for schools to create, school_city, school_country, '
+                 'school_max_students.',
+        )
+        parser.add_argument('--format', choices=('csv', 'ndjson'), help='Defaults to the file extension.')
+        parser.add_argument('--synthetic', type=int, metavar='STUDENTS', help='Generate this many students.')
+        parser.add_argument('--schools', type=int, default=10, help='Schools used by --synthetic.')
+        parser.add_argument('--seed', type=int, help='Random seed for --synthetic.')
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Processes generating --synthetic rows; inserts stay in this process.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--copy', action='store_true', help='Insert with COPY on PostgreSQL.')
+
+    def handle(self, *args, **options):
+        if options['synthetic']:
+            rows = generate_rows(
+                options['synthetic'], options['schools'], options['seed'],
+                workers=options['workers'], batch_size=options['chunk_size'],
+            )
+            self.import_rows(rows, options)
+            return
+        if not options['path']:
+            raise CommandError('Give a file to import or --synthetic.')
+
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        readers = {'csv': read_csv, 'ndjson': read_ndjson, 'jsonl': read_ndjson}
+        if file_format not in readers:
+            raise CommandError(f'Unknown format "{file_format}", use --format.')
+        if options['path'] == '-':
+            self.import_rows(readers[file_format](sys.stdin), options)
+        else:
+            with open(options['path'], newline='', encoding='utf-8') as stream:
+                self.import_rows(readers[file_format](stream), options)
+
+    def import_rows(self, rows, options):
+        self.school_ids = dict(School.objects.values_list('name', 'pk'))
+        totals = {'created': 0, 'capacity': 0, 'invalid': 0}
+        started = time.perf_counter()
+
+        offset = 0
+        while True:
+            chunk = list(islice(rows, options['chunk_size']))
+            if not chunk:
+                break
+            self.import_chunk(chunk, offset, totals, options)
+            offset += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        peak = peak_memory_mb()
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {totals["created"]} of {offset} students in {elapsed:.1f}s '
+            f'({totals["created"] / elapsed if elapsed else 0:.0f} rows/s), '
+            f'{totals["capacity"]} over capacity, {totals["invalid"]} invalid'
+            + (f', peak memory {peak:.0f} MB.' if peak is not None else '.')
+        ))
+
+    def import_chunk(self, chunk, offset, totals, options):
+        school_errors = self.create_missing_schools(chunk, offset)
+
+        students = []
+        for index, row in enumerate(chunk, start=offset + 1):
+            school_pk = self.school_ids.get(row.get('school'))
+            data = {name: row.get(name) or '' for name in STUDENT_FIELDS}
+            try:
+                if index in school_errors:
+                    raise school_errors[index]
+                if school_pk is None:
+                    raise ValidationError(f'Unknown school "{row.get("school")}".')
+                if data['age'] == '':
+                    raise ValidationError('age is required.')
+                student = Student(school_id=school_pk, **data)
+                student.clean_fields(exclude=('school', 'student_id'))
+            except ValidationError as ex:
+                totals['invalid'] += 1
+                self.stderr.write(f'Row {index}: {"; ".join(ex.messages)}')
+                continue
+            students.append((index, student))
+
+        with transaction.atomic():
+            school_pks = {student.school_id for _, student in students}
+            schools = School.objects.select_for_update().order_by('pk').in_bulk(school_pks)
+            rows = [
+                (index, {'school': schools[student.school_id], **{
+                    name: getattr(student, name) for name in STUDENT_FIELDS
+                }})
+                for index, student in students
+            ]
+            created, rejected = bulk_enroll_students(
+                rows, schools, all_or_nothing=False,
+                batch_size=options['chunk_size'], use_copy=options['copy'],
+            )
+            bump_versions('schools', 'students', *(f'school:{pk}' for pk in school_pks))
+
+        totals['created'] += len(created)
+        totals['capacity'] += len(rejected)
+
+    def create_missing_schools(self, chunk, offset)->dict:
+        """
+        Create the schools named in `chunk` that do not exist yet and come
+        with a `school_city` and `school_country`, recording them in the
+        change feed. Returns the `ValidationError` of the rows, by number,
+        describing an invalid school or another one than an earlier row
+        with the same name.
+        """
+        missing, defined_by, errors = {}, {}, {}
+        for index, row in enumerate(chunk, start=offset + 1):
+            name = row.get('school')
+            if not (name and row.get('school_city') and row.get('school_country')) or name in self.school_ids:
+                continue
+            school = School(
+                name=name,
+                city=row['school_city'],
+                country=row['school_country'],
+                max_students=row.get('school_max_students') or 20,
+            )
+            try:
+                school.clean_fields(exclude=('address', ))
+            except ValidationError as ex:
+                errors[index] = ex
+                continue
+            if name not in missing:
+                missing[name], defined_by[name] = school, index
+            elif (school.city, school.country, school.max_students) != (
+                    missing[name].city, missing[name].country, missing[name].max_students):
+                errors[index] = ValidationError(f'School "{name}" differs from row {defined_by[name]}.')
+        if missing:
+            with transaction.atomic():
+                created = School.objects.bulk_create(missing.values())
+                Change.objects.record(Change.CREATE, created)
+                bump_versions('schools')
+            self.school_ids.update((school.name, school.pk) for school in created)
+        return errors
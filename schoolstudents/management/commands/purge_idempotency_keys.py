@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from schoolstudents.idempotency import expired_keys
+
+
+class Command(BaseCommand):
+    help = 'Delete the Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL seconds.'
+
+    def handle(self, *args, **options):
+        deleted, _ = expired_keys().delete()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} expired idempotency key(s) deleted.'))
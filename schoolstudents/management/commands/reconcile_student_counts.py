@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from schoolstudents.models import School, Student
+from schoolstudents.services.school_statistics import rebuild_school_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute School.student_count from the students table and fix any drift, '
+        'then rebuild the school statistics.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report the schools whose counter has drifted.',
+        )
+
+    def handle(self, *args, **options):
+        counts = Student.objects.filter(school=OuterRef('pk')).order_by().values('school').annotate(
+            total=Count('pk')
+        ).values('total')
+
+        with transaction.atomic():
+            drifted = list(
+                School.objects.select_for_update()
+                .annotate(actual=Coalesce(Subquery(counts), 0))
+                .exclude(student_count=F('actual'))
+                .values_list('pk', 'name', 'student_count', 'actual')
+            )
+            for pk, name, stored, actual in drifted:
+                self.stdout.write(f'{name} (id={pk}): student_count {stored} -> {actual}')
+                if not options['dry_run']:
+                    School.objects.filter(pk=pk).update(student_count=actual, version=F('version') + 1)
+
+        self.stdout.write(self.style.SUCCESS(f'{len(drifted)} school(s) out of sync.'))
+        if not options['dry_run']:
+            rows = rebuild_school_statistics()
+            self.stdout.write(self.style.SUCCESS(f'{rows} school statistic row(s) rebuilt.'))
@@ -0,0 +1,144 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestTimings:
+    """
+    SQL count and time plus serialization time of the current request.
+    """
+    __slots__ = ('queries', 'db', 'serialize')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        `connection.execute_wrapper` hook timing every query.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.queries += 1
+
+
+current_timings = contextvars.ContextVar('current_timings', default=None)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Add the duration of the block to the serialization time of the current request.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize += time.perf_counter() - started
+
+
+class Histogram:
+    """
+    Cumulative Prometheus histogram partitioned by a tuple of label values.
+    """
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self.lock:
+            counts = self.series.get(label_values)
+            if counts is None:
+                # One slot per bucket, one for +Inf, then the sum.
+                counts = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def expose(self)->list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((labels, list(counts)) for labels, counts in self.series.items())
+        for label_values, counts in series:
+            labels = ','.join(f'{label}="{escape(value)}"' for label, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {counts[-1]}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+def escape(value)->str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+LABELS = ('view', 'method')
+
+request_duration = Histogram(
+    'schoolstudents_request_duration_seconds', 'Total time spent handling the request.', LABELS, DURATION_BUCKETS)
+db_duration = Histogram(
+    'schoolstudents_db_duration_seconds', 'Time spent executing SQL per request.', LABELS, DURATION_BUCKETS)
+serialize_duration = Histogram(
+    'schoolstudents_serialize_duration_seconds', 'Time spent serializing and rendering per request.',
+    LABELS, DURATION_BUCKETS)
+db_queries = Histogram(
+    'schoolstudents_db_queries', 'SQL queries executed per request.', LABELS, QUERY_BUCKETS)
+
+HISTOGRAMS = (request_duration, db_duration, serialize_duration, db_queries)
+
+# Callables returning more exposition lines, e.g. the connection pools. The
+# modules registering them import this one, which must not import them back.
+collectors = []
+
+
+def register(collector):
+    collectors.append(collector)
+    return collector
+
+
+def observe(view, method, timings, total):
+    labels = (view, method)
+    request_duration.observe(labels, total)
+    db_duration.observe(labels, timings.db)
+    serialize_duration.observe(labels, timings.serialize)
+    db_queries.observe(labels, timings.queries)
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+def expose()->str:
+    """
+    Every metric of this process in the Prometheus text format.
+    """
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    for collector in collectors:
+        lines.extend(collector())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,70 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from schoolstudents import metrics
+from schoolstudents.query_hooks import watch_queries
+
+
+class QueryTimingMiddleware:
+    """
+    Record the SQL count, SQL time, serialization time and total time of
+    every request, aggregate them per view in `schoolstudents.metrics` and
+    report them in a `Server-Timing` header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = metrics.RequestTimings()
+        token = metrics.current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with watch_queries(timings):
+                response = self.get_response(request)
+        finally:
+            metrics.current_timings.reset(token)
+        return self.record(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = metrics.RequestTimings()
+        token = metrics.current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with watch_queries(timings):
+                response = await self.get_response(request)
+        finally:
+            metrics.current_timings.reset(token)
+        return self.record(request, response, timings, time.perf_counter() - started)
+
+    def record(self, request, response, timings, total):
+        match = request.resolver_match
+        metrics.observe(match.view_name if match else '<unresolved>', request.method, timings, total)
+        response['Server-Timing'] = (
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+            f'serialize;dur={timings.serialize * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        DRF responses are rendered after the view returns, time the rendering
+        as part of the serialization.
+        """
+        timings = metrics.current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                timings.serialize += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_student_count(apps, schema_editor):
+    School = apps.get_model('schoolstudents', 'School')
+    Student = apps.get_model('schoolstudents', 'Student')
+    counts = Student.objects.filter(school=OuterRef('pk')).order_by().values('school').annotate(
+        total=Count('pk')
+    ).values('total')
+    School.objects.update(student_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_student_count, migrations.RunPython.noop),
+    ]
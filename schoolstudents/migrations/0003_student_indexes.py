@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# `icontains` compiles to `UPPER(field::text) LIKE UPPER(%s)` on PostgreSQL,
+# so the trigram indexes are built on that exact expression.
+TRIGRAM_INDEXES = (
+    ('student_first_name_trgm', 'schoolstudents_student', 'first_name'),
+    ('student_last_name_trgm', 'schoolstudents_student', 'last_name'),
+    ('school_name_trgm', 'schoolstudents_school', 'name'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0002_school_student_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'last_name', 'first_name'], name='student_school_name_idx'),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='school',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='students', to='schoolstudents.School'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name', 'first_name'], name='student_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['first_name'], name='student_first_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['nationality'], name='student_nationality_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['age'], name='student_age_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
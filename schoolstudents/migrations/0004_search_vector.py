@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:14
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# (table, weighted columns) kept in `search_vector` by a BEFORE trigger, so
+# bulk_create and queryset updates stay indexed as well.
+SEARCH_VECTORS = (
+    ('schoolstudents_student', (('first_name', 'A'), ('last_name', 'A'), ('nationality', 'B'), ('address', 'C'))),
+    ('schoolstudents_school', (('name', 'A'), ('city', 'B'), ('country', 'B'))),
+)
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, columns in SEARCH_VECTORS:
+        vector = ' || '.join(
+            f"setweight(to_tsvector('simple', coalesce(NEW.{column}, '')), '{weight}')"
+            for column, weight in columns
+        )
+        schema_editor.execute(
+            f'CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$ '
+            f'BEGIN NEW.search_vector := {vector}; RETURN NEW; END '
+            f'$$ LANGUAGE plpgsql'
+        )
+        schema_editor.execute(
+            f'CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE ON {table} '
+            f'FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector()'
+        )
+        schema_editor.execute(f'UPDATE {table} SET search_vector = NULL')
+        schema_editor.execute(
+            f'CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, _ in SEARCH_VECTORS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_gin')
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0003_student_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
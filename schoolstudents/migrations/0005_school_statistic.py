@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+
+from schoolstudents.models import age_bucket_expression
+
+
+def populate_school_statistics(apps, schema_editor):
+    SchoolStatistic = apps.get_model('schoolstudents', 'SchoolStatistic')
+    Student = apps.get_model('schoolstudents', 'Student')
+    students = Student.objects.order_by()
+    for dimension, group in (('age', age_bucket_expression()), ('nationality', F('nationality'))):
+        rows = students.annotate(group=group).values_list('school_id', 'group').annotate(total=Count('pk'))
+        SchoolStatistic.objects.bulk_create([
+            SchoolStatistic(school_id=school_pk, dimension=dimension, value=value, student_count=total)
+            for school_pk, value, total in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchoolStatistic',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('age', 'Age'), ('nationality', 'Nationality')], max_length=16)),
+                ('value', models.CharField(max_length=80)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='schoolstudents.school')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('school', 'dimension', 'value'), name='school_statistic_unique')],
+            },
+        ),
+        migrations.RunPython(populate_school_statistics, migrations.RunPython.noop),
+    ]
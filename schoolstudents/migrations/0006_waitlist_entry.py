@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0005_school_statistic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=64)),
+                ('last_name', models.CharField(max_length=64)),
+                ('age', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('nationality', models.CharField(max_length=80)),
+                ('address', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('promoted_at', models.DateTimeField(editable=False, null=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist', to='schoolstudents.school')),
+                ('student', models.OneToOneField(editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='schoolstudents.student')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('promoted_at__isnull', True)), fields=['school', 'id'], name='waitlist_waiting_idx')],
+            },
+        ),
+    ]
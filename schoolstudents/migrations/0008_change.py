@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:49
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0007_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('transaction_id', models.BigIntegerField(default=0)),
+                ('model', models.CharField(max_length=16)),
+                ('object_id', models.IntegerField()),
+                ('school_id', models.IntegerField()),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['transaction_id', 'id'], name='change_feed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schoolstudents', '0008_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='school',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
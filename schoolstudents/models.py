@@ -1,7 +1,130 @@
+import operator
 import uuid
-from django.db import models
-from django.db.models.signals import pre_save
-from django.dispatch import receiver
+from collections import Counter
+from decimal import Decimal
+from functools import reduce
+
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, router, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Greatest
+
+from schoolstudents.db.locks import bounded_lock_wait
+
+
+def current_transaction_id(using)->int:
+    """
+    PostgreSQL's id of the current transaction, 0 on databases serializing
+    their writers, where the order of the ids is already the commit order.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT txid_current()')
+        return cursor.fetchone()[0]
+
+
+def snapshot(instance)->dict:
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if not isinstance(field, SearchVectorField)
+    }
+
+
+def save_new_version(instance, save, db, *args, refresh_fields=(), **kwargs):
+    """
+    `save()` an instance, incrementing its `version` in the UPDATE itself so
+    that writes made since it was loaded are not counted twice. The version
+    and `refresh_fields` are read back after the UPDATE.
+    """
+    if instance._state.adding:
+        return save(*args, **kwargs)
+    update_fields = kwargs.get('update_fields', None)
+    if update_fields is not None:
+        kwargs['update_fields'] = {*update_fields, 'version'}
+    version, instance.version = instance.version, F('version') + 1
+    try:
+        save(*args, **kwargs)
+    except Exception:
+        instance.version = version
+        raise
+    instance.refresh_from_db(using=db, fields=['version', *refresh_fields])
+
+
+class ChangeQuerySet(models.QuerySet):
+    def record(self, action, instances):
+        """
+        Append one `action` change per school or student instance, in the
+        caller's transaction. Record deletes before the rows are deleted.
+        """
+        instances = list(instances)
+        if not instances:
+            return
+        using = self.db
+        transaction_id = current_transaction_id(using)
+        self.bulk_create([
+            Change(
+                transaction_id=transaction_id,
+                model=instance._meta.model_name,
+                object_id=instance.pk,
+                school_id=getattr(instance, 'school_id', instance.pk),
+                action=action,
+                data=None if action == Change.DELETE else snapshot(instance),
+            )
+            for instance in instances
+        ])
+
+
+class Change(models.Model):
+    """
+    Append-only log of the school and student writes, read by the change
+    feed in (transaction_id, id) order, see `services.change_feed`.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = ((CREATE, 'Create'), (UPDATE, 'Update'), (DELETE, 'Delete'))
+
+    id = models.BigAutoField(primary_key=True)
+    transaction_id = models.BigIntegerField(default=0)
+    model = models.CharField(max_length=16)
+    object_id = models.IntegerField()
+    school_id = models.IntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    # Fields of the row after a create or update.
+    data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ChangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['transaction_id', 'id'], name='change_feed_idx'),
+        ]
+
+
+class SchoolQuerySet(models.QuerySet):
+    def admit_student(self, school_pk)->bool:
+        """
+        Take one seat in the school if it still has room.
+        The conditional UPDATE is atomic on the row, so two writers can
+        never both take the last seat.
+        """
+        admitted = self.filter(
+            pk=school_pk, student_count__lt=F('max_students')
+        ).update(student_count=F('student_count') + 1, version=F('version') + 1)
+        return bool(admitted)
+
+    def release_students(self, school_pk, count=1)->int:
+        """
+        Give back `count` seats in the school.
+        """
+        return self.filter(pk=school_pk, student_count__gte=count).update(
+            student_count=F('student_count') - count, version=F('version') + 1
+        )
 
 
 class School(models.Model):
@@ -10,23 +133,192 @@ class School(models.Model):
     city = models.CharField(max_length=80)
     country = models.CharField(max_length=80)
     address = models.TextField(blank=True)
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped by every write of the row, the seat counter included; the ETag.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Maintained by a database trigger on PostgreSQL, see migration 0004.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SchoolQuerySet.as_manager()
 
     def __str__(self)->str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        An update never writes `student_count`: the seats are taken and given
+        back by conditional UPDATEs, which the loaded value would overwrite.
+        The stored count is read back instead.
+        """
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            action = Change.CREATE if self._state.adding else Change.UPDATE
+            refresh_fields = ()
+            if not self._state.adding:
+                update_fields = kwargs.get('update_fields', None)
+                if update_fields is None:
+                    deferred = self.get_deferred_fields()
+                    update_fields = [
+                        field.attname for field in self._meta.concrete_fields
+                        if not field.primary_key and field.attname not in deferred
+                    ]
+                kwargs['update_fields'] = [name for name in update_fields if name != 'student_count']
+                refresh_fields = ('student_count', )
+            save_new_version(self, super().save, using, *args, refresh_fields=refresh_fields, **kwargs)
+            Change.objects.using(using).record(action, [self])
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the school and its students, recording a change for each.
+        """
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            changes = Change.objects.using(using)
+            changes.record(Change.DELETE, self.students.using(using).only('pk', 'school_id'))
+            changes.record(Change.DELETE, [self])
+            return super().delete(*args, **kwargs)
+
     @property
     def total_student(self)->int:
-        return self.students.count()
+        return self.student_count
+
+    @property
+    def remaining_capacity(self)->int:
+        return max(self.max_students - self.student_count, 0)
+
+
+# Upper bounds (exclusive) of the age groups of the school statistics.
+AGE_BUCKETS = (6, 10, 14, 18)
+AGE_BUCKET_LABELS = (
+    f'<{AGE_BUCKETS[0]}',
+    *(f'{low}-{high}' for low, high in zip(AGE_BUCKETS, AGE_BUCKETS[1:])),
+    f'{AGE_BUCKETS[-1]}+',
+)
+
+
+def age_bucket(age)->str:
+    age = Decimal(str(age))
+    for bound, label in zip(AGE_BUCKETS, AGE_BUCKET_LABELS):
+        if age < bound:
+            return label
+    return AGE_BUCKET_LABELS[-1]
+
+
+def age_bucket_expression():
+    """
+    `age_bucket` of the `age` column computed by the database.
+    """
+    return Case(
+        *(When(age__lt=bound, then=Value(label)) for bound, label in zip(AGE_BUCKETS, AGE_BUCKET_LABELS)),
+        default=Value(AGE_BUCKET_LABELS[-1]),
+        output_field=models.CharField(),
+    )
+
+
+class SchoolStatisticQuerySet(models.QuerySet):
+    def add(self, changes, batch_size=200):
+        """
+        Add the `{(school_pk, dimension, value): delta}` changes to the
+        counters, with one INSERT of the missing counters and one UPDATE
+        per `batch_size` counters.
+        """
+        changes = [(key, delta) for key, delta in changes.items() if delta]
+        self.bulk_create([
+            SchoolStatistic(school_id=school_pk, dimension=dimension, value=value)
+            for (school_pk, dimension, value), delta in changes if delta > 0
+        ], ignore_conflicts=True)
+        for start in range(0, len(changes), batch_size):
+            batch = [
+                (Q(school_id=school_pk, dimension=dimension, value=value), delta)
+                for (school_pk, dimension, value), delta in changes[start:start + batch_size]
+            ]
+            self.filter(reduce(operator.or_, (match for match, _ in batch))).update(student_count=Case(
+                *(When(match, then=Greatest(F('student_count') + delta, 0)) for match, delta in batch),
+                default=F('student_count'),
+                output_field=models.PositiveIntegerField(),
+            ))
+
+
+class SchoolStatistic(models.Model):
+    """
+    Students of a school per age group and per nationality, kept in step
+    with every student write so the statistics never scan the students.
+    """
+    AGE = 'age'
+    NATIONALITY = 'nationality'
+    DIMENSIONS = ((AGE, 'Age'), (NATIONALITY, 'Nationality'))
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='statistics')
+    dimension = models.CharField(max_length=16, choices=DIMENSIONS)
+    value = models.CharField(max_length=80)
+    student_count = models.PositiveIntegerField(default=0)
+
+    objects = SchoolStatisticQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['school', 'dimension', 'value'], name='school_statistic_unique'),
+        ]
+
+
+class StudentQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Release the seats of every deleted student, one UPDATE per school,
+        and update the school statistics. The students are locked first, so
+        the seats released are those of the rows this call deletes.
+        """
+        with transaction.atomic(using=self.db):
+            with bounded_lock_wait(self.db):
+                pks = list(self.order_by('pk').select_for_update().values_list('pk', flat=True))
+            students = self.model.objects.using(self.db).filter(pk__in=pks)
+            groups = list(
+                students.order_by().annotate(age_group=age_bucket_expression())
+                .values_list('school_id', 'age_group', 'nationality').annotate(total=Count('pk'))
+            )
+            Change.objects.using(self.db).record(Change.DELETE, students.order_by().only('pk', 'school_id'))
+            deleted = super(StudentQuerySet, students).delete()
+            per_school, changes = Counter(), Counter()
+            for school_pk, age_group, nationality, total in groups:
+                per_school[school_pk] += total
+                changes[school_pk, SchoolStatistic.AGE, age_group] -= total
+                changes[school_pk, SchoolStatistic.NATIONALITY, nationality] -= total
+            # In pk order, as the school rows are locked by bulk enrollment.
+            for school_pk, total in sorted(per_school.items()):
+                School.objects.using(self.db).release_students(school_pk, total)
+            SchoolStatistic.objects.using(self.db).add(changes)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Student(models.Model):
-    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='students')
+    # Indexed by the (school, last_name, first_name) composite index below.
+    school = models.ForeignKey(
+        School, on_delete=models.CASCADE, related_name='students', db_index=False
+    )
     first_name = models.CharField(max_length=64)
     last_name = models.CharField(max_length=64)
     student_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     age = models.DecimalField(max_digits=5, decimal_places=2, blank=True)
     nationality = models.CharField(max_length=80)
     address = models.TextField(blank=True)
+    # Bumped by every write of the row; the ETag.
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Maintained by a database trigger on PostgreSQL, see migration 0004.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = StudentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['school', 'last_name', 'first_name'], name='student_school_name_idx'),
+            models.Index(fields=['last_name', 'first_name'], name='student_name_idx'),
+            models.Index(fields=['first_name'], name='student_first_name_idx'),
+            models.Index(fields=['nationality'], name='student_nationality_idx'),
+            models.Index(fields=['age'], name='student_age_idx'),
+        ]
 
     @property
     def full_name(self):
@@ -34,3 +326,116 @@ class Student(models.Model):
 
     def __str__(self)->str:
         return self.full_name
+
+    def statistic_keys(self)->tuple:
+        """
+        The `SchoolStatistic` counters the student is counted in.
+        """
+        return (
+            (self.school_id, SchoolStatistic.AGE, age_bucket(self.age)),
+            (self.school_id, SchoolStatistic.NATIONALITY, self.nationality),
+        )
+
+    def lock_stored(self, using)->tuple:
+        """
+        Lock the stored row until the end of the transaction and return its
+        `statistic_keys`, empty if it is not stored. The stored school is
+        kept in `previous_school_id`, whose seat a move or delete gives back:
+        the instance may have been loaded before a concurrent write.
+        """
+        stored = None
+        if self.pk is not None:
+            with bounded_lock_wait(using):
+                stored = Student.objects.using(using).select_for_update().filter(pk=self.pk).values_list(
+                    'school_id', 'age', 'nationality'
+                ).first()
+        if stored is None:
+            self.previous_school_id = None
+            return ()
+        school_id, age, nationality = stored
+        self.previous_school_id = school_id
+        return Student(school_id=school_id, age=age, nationality=nationality).statistic_keys()
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            adding = self._state.adding
+            previous = () if adding else self.lock_stored(using)
+            save_new_version(self, super().save, using, *args, **kwargs)
+            changes = Counter(self.statistic_keys())
+            changes.subtract(previous)
+            SchoolStatistic.objects.using(using).add(changes)
+            Change.objects.using(using).record(Change.CREATE if adding else Change.UPDATE, [self])
+
+    def delete(self, *args, **kwargs):
+        """
+        Give back the seat and the statistics of the stored row, only when
+        this call deleted it.
+        """
+        using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            previous = self.lock_stored(using)
+            school_pk = self.previous_school_id
+            if school_pk is not None:
+                Change.objects.using(using).record(Change.DELETE, [self])
+            deleted = super().delete(*args, **kwargs)
+            if deleted[1].get(self._meta.label):
+                School.objects.using(using).release_students(school_pk)
+                SchoolStatistic.objects.using(using).add({key: -1 for key in previous})
+        return deleted
+
+
+class WaitlistEntryQuerySet(models.QuerySet):
+    def waiting(self):
+        return self.filter(promoted_at__isnull=True)
+
+
+class WaitlistEntry(models.Model):
+    """
+    A student queued for a seat in a full school, enrolled first come first
+    served when a seat is freed, see `services.waitlist.promote_waitlist`.
+    """
+    STUDENT_FIELDS = ('first_name', 'last_name', 'age', 'nationality', 'address')
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='waitlist')
+    first_name = models.CharField(max_length=64)
+    last_name = models.CharField(max_length=64)
+    age = models.DecimalField(max_digits=5, decimal_places=2)
+    nationality = models.CharField(max_length=80)
+    address = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, editable=False)
+    student = models.OneToOneField(
+        Student, on_delete=models.SET_NULL, null=True, editable=False, related_name='waitlist_entry'
+    )
+
+    objects = WaitlistEntryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The queue of each school: the waiting entries in insertion order.
+            models.Index(fields=['school', 'id'], name='waitlist_waiting_idx', condition=Q(promoted_at__isnull=True)),
+        ]
+
+    def __str__(self)->str:
+        return f'{self.first_name} {self.last_name}'
+
+    @property
+    def status(self)->str:
+        return 'waiting' if self.promoted_at is None else 'enrolled'
+
+
+class IdempotencyKey(models.Model):
+    """
+    The response of a create request sent with an `Idempotency-Key` header,
+    replayed for the retries of the request, see `idempotency.py`.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    # sha256 of the method, path and body, so a reused key is detected.
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self)->str:
+        return self.key
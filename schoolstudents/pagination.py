@@ -0,0 +1,156 @@
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param
+
+
+class OrderingCursorPagination(CursorPagination):
+    """
+    Keyset pagination driven by the view's `OrderingFilter`.
+
+    The requested ordering, every field of it, is followed by `id` in the
+    direction of the last field as a tiebreak so every page is stable, and related lookups such as `school__name` are allowed. The
+    cursor holds the ordering values of the last row, id included, and the
+    next page is `WHERE (field, id) > (value, id)`: no OFFSET, however deep
+    the page. The ordering fields must not be nullable.
+    No COUNT(*) is issued unless the client asks for it with `?count=true`.
+    """
+    ordering = ('id', )
+    tiebreak_field = 'id'
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = self.ordering
+        for filter_cls in getattr(view, 'filter_backends', []):
+            if hasattr(filter_cls, 'get_ordering'):
+                ordering = filter_cls().get_ordering(request, queryset, view) or ordering
+                break
+
+        ordering = tuple(ordering)
+        for index, field in enumerate(ordering):
+            if field.lstrip('-') in (self.tiebreak_field, 'pk'):
+                # Unique already, the fields after it never apply.
+                return ordering[:index + 1]
+        descending = ordering[-1].startswith('-')
+        return (*ordering, f'-{self.tiebreak_field}' if descending else self.tiebreak_field)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() == 'true':
+            self.count = queryset.count()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = [invert(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(keyset_filter(ordering, self.cursor.position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_following
+        else:
+            self.has_next, self.has_previous = has_following, self.cursor is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        try:
+            position = json.loads(cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Nothing before the cursor of a previous link, start over.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.get_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.get_position(self.page[0])))
+
+    def get_position(self, instance)->str:
+        """
+        The cursor position of `instance`, its values of the ordering fields.
+        """
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(instance, dict) and name in instance:
+                value = instance[name]
+            else:
+                value = instance
+                for part in name.split('__'):
+                    value = value[part] if isinstance(value, dict) else getattr(value, part)
+            values.append(value if isinstance(value, (int, str)) else str(value))
+        return json.dumps(values)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+            response.move_to_end('count', last=False)
+        return Response(response)
+
+
+def invert(field)->str:
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def keyset_filter(ordering, values)->Q:
+    """
+    The rows after `values` in `ordering`: `(a, b) > (x, y)` spelled
+    `a > x OR (a = x AND b > y)`, `<` for descending fields.
+    """
+    after, equal = Q(), {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        after |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return after
+
+
+class CursorPaginationMixin:
+    """
+    Opt into keyset pagination per request with `?pagination=cursor`;
+    page number pagination stays the default.
+    """
+    pagination_query_param = 'pagination'
+    cursor_pagination_class = OrderingCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            mode = self.request.query_params.get(self.pagination_query_param, None)
+            if mode == 'cursor' or self.cursor_pagination_class.cursor_query_param in self.request.query_params:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
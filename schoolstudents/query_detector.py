@@ -0,0 +1,162 @@
+import logging
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from schoolstudents import query_hooks
+
+
+logger = logging.getLogger(__name__)
+
+NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:''|[^'])*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+# Transaction control repeats on every save and is never an N+1.
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT', 'BEGIN', 'COMMIT')
+SKIPPED_FILES = (__file__, query_hooks.__file__)
+
+
+class QueryDetectorError(AssertionError):
+    pass
+
+
+def normalize_sql(sql)->str:
+    """
+    The shape of a query: literals, parameters and IN lists replaced by placeholders.
+    """
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def caller_location()->str:
+    """
+    The innermost frame of the project which led to the query.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(settings.BASE_DIR) and filename not in SKIPPED_FILES and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, settings.BASE_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return '<unknown>'
+
+
+class QueryDetector:
+    """
+    Collect repeated query shapes (N+1) and slow queries while `watch()` is active.
+    """
+    def __init__(self, repeat_threshold=None, slow_ms=None):
+        self.repeat_threshold = repeat_threshold or settings.QUERY_DETECTOR_REPEAT_THRESHOLD
+        self.slow_seconds = (settings.QUERY_DETECTOR_SLOW_MS if slow_ms is None else slow_ms) / 1000
+        self.shapes = Counter()
+        self.locations = {}
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if not sql.lstrip().upper().startswith(IGNORED_PREFIXES):
+                shape = normalize_sql(sql)
+                self.shapes[shape] += 1
+                if shape not in self.locations:
+                    self.locations[shape] = caller_location()
+                if duration >= self.slow_seconds:
+                    self.slow.append((duration, shape, self.locations[shape]))
+
+    def watch(self):
+        return query_hooks.watch_queries(self)
+
+    def repeated(self)->list:
+        """
+        (count, shape, location) of every shape executed `repeat_threshold` times or more.
+        """
+        return [
+            (count, shape, self.locations[shape])
+            for shape, count in self.shapes.most_common()
+            if count >= self.repeat_threshold
+        ]
+
+    def report(self, label)->list:
+        """
+        Log the findings under `label` and return the repeated shapes.
+        """
+        repeated = self.repeated()
+        for count, shape, location in repeated:
+            logger.warning('%s: query repeated %d times (N+1) at %s: %s', label, count, location, shape)
+        for duration, shape, location in self.slow:
+            logger.warning('%s: slow query (%.1f ms) at %s: %s', label, duration * 1000, location, shape)
+        return repeated
+
+
+@contextmanager
+def polling():
+    """
+    Leave the queries of the block out of the `QueryDetector`, for loops
+    repeating a query on purpose such as a long-poll.
+    """
+    token = query_hooks.current_hooks.set(tuple(
+        hook for hook in query_hooks.current_hooks.get() if not isinstance(hook, QueryDetector)
+    ))
+    try:
+        yield
+    finally:
+        query_hooks.current_hooks.reset(token)
+
+
+class QueryDetectorMiddleware:
+    """
+    Run the `QueryDetector` on a `QUERY_DETECTOR_SAMPLE_RATE` fraction of the
+    requests. With `QUERY_DETECTOR_STRICT`, as in the test suite, every
+    request is checked and an N+1 raises `QueryDetectorError`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        detector = QueryDetector()
+        with detector.watch():
+            response = self.get_response(request)
+        return self.check(request, detector, response)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        detector = QueryDetector()
+        with detector.watch():
+            response = await self.get_response(request)
+        return self.check(request, detector, response)
+
+    def sampled(self)->bool:
+        return settings.QUERY_DETECTOR_STRICT or random.random() < settings.QUERY_DETECTOR_SAMPLE_RATE
+
+    def check(self, request, detector, response):
+        repeated = detector.report(f'{request.method} {request.path}')
+        if settings.QUERY_DETECTOR_STRICT and repeated:
+            count, shape, location = repeated[0]
+            raise QueryDetectorError(
+                f'{request.method} {request.path} repeated a query {count} times at {location}: {shape}')
+        return response
+
@@ -0,0 +1,37 @@
+import contextvars
+from contextlib import contextmanager
+from functools import partial
+
+
+current_hooks = contextvars.ContextVar('query_hooks', default=())
+
+
+def execute_hooks(execute, sql, params, many, context):
+    """
+    `connection.execute_wrappers` entry running the hooks of the current context.
+
+    It is installed on every connection when it opens, so the hooks also see
+    the queries which the async ORM runs in `sync_to_async` threads; a plain
+    `connection.execute_wrapper()` only covers the connection of its thread.
+    """
+    for hook in reversed(current_hooks.get()):
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def watch_queries(hook):
+    """
+    Call `hook(execute, sql, params, many, context)` for every query run within
+    the block, like `connection.execute_wrapper(hook)` on every connection.
+    """
+    token = current_hooks.set(current_hooks.get() + (hook,))
+    try:
+        yield hook
+    finally:
+        current_hooks.reset(token)
+
+
+def install_execute_hooks(connection):
+    if execute_hooks not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, execute_hooks)
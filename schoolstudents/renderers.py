@@ -0,0 +1,97 @@
+import csv
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` which encodes with orjson when it is installed.
+
+    orjson writes the same bytes as the compact, non-ASCII-escaping
+    `json.dumps` used by DRF for str, int, bool, None, list and dict data;
+    anything else it refuses (Decimal, lazy strings, big ints) makes it
+    fall back to `JSONRenderer`. Floats are encoded by orjson too and may
+    differ in exponent notation, the serializers of this app emit none.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class Echo:
+    """
+    File-like object handing back what `csv.writer` writes to it.
+    """
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Render a list of flat dicts as CSV with a header row. `stream` yields
+    the same output in chunks for `StreamingHttpResponse`.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = [data]
+        header = list(data[0]) if data else []
+        return b''.join(self.stream(header, data))
+
+    def stream(self, header, items, chunk_size=1000):
+        writer = csv.writer(Echo())
+        lines = [writer.writerow(header)]
+        for item in items:
+            lines.append(writer.writerow([
+                '' if item.get(name) is None else item.get(name) for name in header
+            ]))
+            if len(lines) >= chunk_size:
+                yield ''.join(lines).encode(self.charset)
+                lines = []
+        if lines:
+            yield ''.join(lines).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Render a list as newline delimited JSON, one object per line. `stream`
+    yields the same output in chunks for `StreamingHttpResponse`.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = [data]
+        return b''.join(self.stream(None, data))
+
+    def stream(self, header, items, chunk_size=1000):
+        renderer = FastJSONRenderer()
+        lines = []
+        for item in items:
+            lines.append(renderer.render(item))
+            if len(lines) >= chunk_size:
+                yield b'\n'.join(lines) + b'\n'
+                lines = []
+        if lines:
+            yield b'\n'.join(lines) + b'\n'
@@ -1,14 +1,87 @@
 from rest_framework import serializers
-from schoolstudents.models import School, Student
+from schoolstudents.models import School, Student, WaitlistEntry
+from schoolstudents.sparse_fields import SparseFieldsSerializerMixin
 
 
-class SchoolSerializer(serializers.ModelSerializer):
+class SchoolSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    remaining_capacity = serializers.IntegerField(read_only=True)
+
+    field_sources = {'remaining_capacity': ('max_students', 'student_count')}
+
     class Meta:
         model = School
-        fields = '__all__'
+        exclude = ('search_vector', )
+
+
+class SchoolRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field which resolves the school from `context['schools']`
+    when the caller has already loaded them, e.g. for bulk enrollment.
+    """
+    def to_internal_value(self, data):
+        schools = self.context.get('schools', None)
+        if schools is None:
+            return super().to_internal_value(data)
+        try:
+            return schools[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class StudentListSerializer(serializers.ListSerializer):
+    """
+    Validate every row on its own so that one bad row does not hide the
+    valid ones. Results are kept in `valid_rows` and `row_errors` as
+    `(index, data)` pairs.
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail('not_a_list', input_type=type(data).__name__)
+
+        self.valid_rows = []
+        self.row_errors = []
+        for index, item in enumerate(data):
+            try:
+                self.valid_rows.append((index, self.child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                self.row_errors.append((index, exc.detail))
+
+        if self.row_errors:
+            errors = [{} for _ in data]
+            for index, detail in self.row_errors:
+                errors[index] = detail
+            raise serializers.ValidationError(errors)
+        return [row for _, row in self.valid_rows]
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    school = SchoolRelatedField(queryset=School.objects.all())
+
+    expandable_fields = {'school': SchoolSerializer}
+
     class Meta:
         model = Student
-        fields = '__all__'
\ No newline at end of file
+        exclude = ('search_vector', )
+        list_serializer_class = StudentListSerializer
+
+
+class StudentTransferSerializer(serializers.Serializer):
+    students = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+    # The destination school.
+    school = serializers.PrimaryKeyRelatedField(queryset=School.objects.all())
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    status = serializers.CharField(read_only=True)
+    # Place in the queue, 1 being the next one enrolled; null once enrolled.
+    position = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = (
+            'id', 'school', 'first_name', 'last_name', 'age', 'nationality', 'address',
+            'created_at', 'status', 'position', 'promoted_at', 'student',
+        )
+        read_only_fields = ('school', )
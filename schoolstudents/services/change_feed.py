@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from schoolstudents.models import Change
+
+
+def parse_feed_params(query_params)->tuple:
+    """
+    (since, limit, wait) of a change feed request, `since` being the
+    (transaction_id, id) of the last change already read.
+    """
+    since = query_params.get('since', '') or '0.0'
+    try:
+        transaction_id, change_id = (int(part) for part in since.split('.'))
+    except ValueError:
+        raise ValidationError({'since': ['Expected a cursor returned by the feed.']})
+    try:
+        limit = min(int(query_params.get('limit', settings.CHANGE_FEED_PAGE_SIZE)), settings.CHANGE_FEED_PAGE_SIZE)
+        wait = min(float(query_params.get('wait', 0)), settings.CHANGE_FEED_MAX_WAIT)
+    except ValueError:
+        raise ValidationError('`limit` and `wait` must be numbers.')
+    if limit < 1 or wait < 0:
+        raise ValidationError('`limit` must be positive and `wait` not negative.')
+    return (transaction_id, change_id), limit, wait
+
+
+def stable_transaction_horizon(using=DEFAULT_DB_ALIAS):
+    """
+    Every transaction below this PostgreSQL transaction id has ended, so
+    no change with a lower `transaction_id` can appear later. None on
+    databases serializing their writers.
+
+    The horizon is the oldest transaction running in the whole cluster,
+    whatever it touches: one long transaction holds back the feed until it
+    ends.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT txid_snapshot_xmin(txid_current_snapshot())')
+        return cursor.fetchone()[0]
+
+
+def read_changes(since, limit)->dict:
+    """
+    The next `limit` changes after the `since` cursor, with the cursor to
+    read the following ones. Changes of transactions still running are
+    held back, so the cursor never skips a change committed later.
+    """
+    transaction_id, change_id = since
+    changes = Change.objects.filter(
+        Q(transaction_id__gt=transaction_id) | Q(transaction_id=transaction_id, id__gt=change_id)
+    )
+    horizon = stable_transaction_horizon()
+    if horizon is not None:
+        changes = changes.filter(transaction_id__lt=horizon)
+    rows = list(changes.order_by('transaction_id', 'id').values(
+        'id', 'transaction_id', 'model', 'object_id', 'school_id', 'action', 'data', 'created_at',
+    )[:limit])
+
+    if rows:
+        since = rows[-1]['transaction_id'], rows[-1]['id']
+    created_at = serializers.DateTimeField()
+    return {
+        'changes': [
+            {
+                'id': row['id'],
+                'model': row['model'],
+                'object_id': row['object_id'],
+                'school': row['school_id'],
+                'action': row['action'],
+                'data': row['data'],
+                'created_at': created_at.to_representation(row['created_at']),
+            }
+            for row in rows
+        ],
+        'cursor': '.'.join(str(part) for part in since),
+        'more': len(rows) == limit,
+    }
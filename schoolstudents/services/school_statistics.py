@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from schoolstudents.models import AGE_BUCKET_LABELS, SchoolStatistic, Student, age_bucket_expression
+
+
+def count_statistics(students)->list:
+    """
+    `SchoolStatistic` rows of the `students` queryset, one aggregate query per dimension.
+    """
+    students = students.order_by()
+    groups = (
+        (SchoolStatistic.AGE, students.annotate(group=age_bucket_expression())),
+        (SchoolStatistic.NATIONALITY, students.annotate(group=F('nationality'))),
+    )
+    return [
+        SchoolStatistic(school_id=school_pk, dimension=dimension, value=value, student_count=total)
+        for dimension, queryset in groups
+        for school_pk, value, total in queryset.values_list('school_id', 'group').annotate(total=Count('pk'))
+    ]
+
+
+def rebuild_school_statistics(school_pks=None)->int:
+    """
+    Recompute the statistics of the schools (all by default) from the
+    students table, e.g. after queryset updates which bypass the counters.
+    """
+    students = Student.objects.all()
+    statistics = SchoolStatistic.objects.all()
+    if school_pks is not None:
+        students = students.filter(school__in=school_pks)
+        statistics = statistics.filter(school__in=school_pks)
+    with transaction.atomic():
+        rows = count_statistics(students)
+        statistics.delete()
+        SchoolStatistic.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def school_statistics(schools)->list:
+    """
+    Enrollment, remaining capacity, age distribution and nationality
+    breakdown of each school, read from the counters in a single query.
+    """
+    breakdowns = {
+        school.pk: {SchoolStatistic.AGE: dict.fromkeys(AGE_BUCKET_LABELS, 0), SchoolStatistic.NATIONALITY: {}}
+        for school in schools
+    }
+    counters = SchoolStatistic.objects.filter(school__in=list(breakdowns), student_count__gt=0).order_by(
+        'school', 'dimension', '-student_count', 'value'
+    ).values_list('school_id', 'dimension', 'value', 'student_count')
+    for school_pk, dimension, value, total in counters:
+        breakdowns[school_pk][dimension][value] = total
+    return [
+        {
+            'id': school.pk,
+            'name': school.name,
+            'max_students': school.max_students,
+            'student_count': school.student_count,
+            'remaining_capacity': school.remaining_capacity,
+            'age_distribution': breakdowns[school.pk][SchoolStatistic.AGE],
+            'nationalities': breakdowns[school.pk][SchoolStatistic.NATIONALITY],
+        }
+        for school in schools
+    ]
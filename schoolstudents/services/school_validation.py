@@ -1,7 +1,18 @@
 from django.core.exceptions import ValidationError
+from schoolstudents.db.locks import bounded_lock_wait
+from schoolstudents.db.router import use_primary
 from schoolstudents.models import School
 
 def before_save_trigger_school(school_instance, student_limit, **kwargs):
-    if school_instance.total_student > student_limit:
+    """
+    Whether the school can be limited to `student_limit` students. The
+    school row stays locked until the end of the caller's transaction, so
+    no seat can be taken before the new limit is saved.
+    """
+    with use_primary(), bounded_lock_wait():
+        student_count = School.objects.select_for_update().values_list(
+            'student_count', flat=True
+        ).get(pk=school_instance.pk)
+    if student_count > student_limit:
         return False
     return True
\ No newline at end of file
@@ -0,0 +1,82 @@
+import csv
+import io
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import F
+
+from schoolstudents.models import Change, School, SchoolStatistic, Student
+
+
+# Every NOT NULL column but the primary key, the table has no database defaults.
+COPY_COLUMNS = ('school_id', 'first_name', 'last_name', 'student_id', 'age', 'nationality', 'address', 'version')
+
+
+def copy_students(students, using)->bool:
+    """
+    Insert students with PostgreSQL `COPY ... FROM STDIN`. Returns False,
+    without writing, when the connection cannot COPY (not PostgreSQL, or
+    not psycopg2). Primary keys are not set on the instances.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        copy_expert = getattr(cursor.cursor, 'copy_expert', None)
+        if copy_expert is None:
+            return False
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for student in students:
+            writer.writerow([getattr(student, column) for column in COPY_COLUMNS])
+        buffer.seek(0)
+        copy_expert(
+            f'COPY {Student._meta.db_table} ({", ".join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+    return True
+
+
+def bulk_enroll_students(rows, schools, all_or_nothing=True, batch_size=None, use_copy=False):
+    """
+    Insert validated student rows with `bulk_create`, admitting only as
+    many students as each school has seats left.
+
+    `rows` are `(index, validated_data)` pairs and `schools` maps pk to the
+    School rows, which the caller must have locked with select_for_update.
+    Returns the created students and the indexes rejected for capacity;
+    nothing is written when `all_or_nothing` and any row is rejected.
+    `use_copy` switches to `COPY` on PostgreSQL (psycopg2 only).
+    A create is appended to the change feed for every student.
+    """
+    remaining = {pk: school.max_students - school.student_count for pk, school in schools.items()}
+    admitted, rejected = [], []
+    for index, data in rows:
+        school_pk = data['school'].pk
+        if remaining[school_pk] > 0:
+            remaining[school_pk] -= 1
+            admitted.append(Student(**data))
+        else:
+            rejected.append(index)
+
+    if not admitted or (rejected and all_or_nothing):
+        return [], rejected
+
+    if use_copy and copy_students(admitted, router.db_for_write(Student)):
+        pks = dict(Student.objects.filter(
+            student_id__in=[student.student_id for student in admitted]
+        ).values_list('student_id', 'pk'))
+        for student in admitted:
+            student.pk = pks[student.student_id]
+    else:
+        Student.objects.bulk_create(
+            admitted, batch_size=batch_size or settings.BULK_ENROLLMENT_BATCH_SIZE
+        )
+    for school_pk, total in Counter(student.school_id for student in admitted).items():
+        School.objects.filter(pk=school_pk).update(
+            student_count=F('student_count') + total, version=F('version') + 1
+        )
+    SchoolStatistic.objects.add(Counter(key for student in admitted for key in student.statistic_keys()))
+    Change.objects.record(Change.CREATE, admitted)
+    return admitted, rejected
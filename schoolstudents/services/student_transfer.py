@@ -0,0 +1,62 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.http import Http404
+
+from schoolstudents.db.locks import bounded_lock_wait
+from schoolstudents.db.router import use_primary
+from schoolstudents.models import Change, School, SchoolStatistic, Student, age_bucket_expression
+
+
+def transfer_students(source_pk, destination_pk, student_pks, all_or_nothing=True)->tuple:
+    """
+    Move students of the source school to the destination school with one
+    UPDATE, checking the destination's free seats once.
+
+    Both school rows and the moved students are locked for the transfer.
+    Returns the moved student pks, the requested pks which are not students
+    of the source school and, in request order, those over the destination's
+    capacity; nothing is moved when `all_or_nothing` and seats are short.
+    """
+    with transaction.atomic(), use_primary():
+        with bounded_lock_wait():
+            schools = School.objects.select_for_update().order_by('pk').in_bulk({source_pk, destination_pk})
+            if len(schools) < 2:
+                raise Http404('No School matches the given query.')
+            found = set(Student.objects.select_for_update().filter(
+                school=source_pk, pk__in=student_pks
+            ).order_by('pk').values_list('pk', flat=True))
+
+        requested = list(dict.fromkeys(student_pks))
+        movable = [pk for pk in requested if pk in found]
+        not_found = [pk for pk in requested if pk not in found]
+        destination = schools[destination_pk]
+        free = max(destination.max_students - destination.student_count, 0)
+        over_capacity = []
+        if len(movable) > free:
+            if all_or_nothing:
+                return [], not_found, movable
+            movable, over_capacity = movable[:free], movable[free:]
+        if not movable:
+            return [], not_found, over_capacity
+
+        students = Student.objects.filter(pk__in=movable)
+        groups = list(
+            students.order_by().annotate(age_group=age_bucket_expression())
+            .values_list('age_group', 'nationality').annotate(total=Count('pk'))
+        )
+        students.update(school_id=destination_pk, version=F('version') + 1)
+        School.objects.release_students(source_pk, len(movable))
+        School.objects.filter(pk=destination_pk).update(
+            student_count=F('student_count') + len(movable), version=F('version') + 1
+        )
+
+        changes = Counter()
+        for age_group, nationality, total in groups:
+            for key in ((SchoolStatistic.AGE, age_group), (SchoolStatistic.NATIONALITY, nationality)):
+                changes[(source_pk, *key)] -= total
+                changes[(destination_pk, *key)] += total
+        SchoolStatistic.objects.add(changes)
+        Change.objects.record(Change.UPDATE, students.order_by('pk'))
+    return movable, not_found, over_capacity
@@ -1,7 +1,21 @@
 from django.core.exceptions import ValidationError
+from schoolstudents.db.locks import bounded_lock_wait
+from schoolstudents.db.router import use_primary
 from schoolstudents.models import School
 
-def before_save_trigger_student(school_obj, **kwargs):
-    if school_obj.total_student >= school_obj.max_students:
-        return False
-    return True
\ No newline at end of file
+def before_save_trigger_student(school_obj, previous_school_id=None, **kwargs):
+    """
+    Take a seat for the student in `school_obj`, releasing the seat in the
+    previous school when the student is moved. Returns False when full.
+    The capacity is always checked on the primary, never on a replica, by
+    a conditional UPDATE which holds the school row until the transaction
+    ends; waiting for it longer than `SCHOOL_LOCK_TIMEOUT` raises a 409.
+    """
+    if school_obj.pk == previous_school_id:
+        return True
+    with use_primary(), bounded_lock_wait():
+        if not School.objects.admit_student(school_obj.pk):
+            return False
+        if previous_school_id:
+            School.objects.release_students(previous_school_id)
+    return True
@@ -0,0 +1,101 @@
+"""
+Fake school and student rows for load tests, in the row format read by
+`manage.py import_students`. Nothing here touches the database, so batches
+can be generated in worker processes while one writer inserts them.
+"""
+import math
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from faker import Faker
+
+
+_fake_generator = None
+
+
+def get_fake_generator(seed):
+    """
+    One Faker per process, re-seeded for every batch.
+    """
+    global _fake_generator
+    if _fake_generator is None:
+        _fake_generator = Faker()
+    _fake_generator.seed_instance(seed)
+    return _fake_generator
+
+
+def batch_seed(seed, batch)->int:
+    """
+    Seed of one batch; it only depends on the batch number so the rows are
+    the same whatever the number of workers.
+    """
+    return seed * 1000003 + batch
+
+
+def generate_school_pool(total, schools, seed=None)->list:
+    """
+    `schools` schools, each large enough to hold its share of `total` students.
+    """
+    fake_generator = get_fake_generator(seed)
+    max_students = math.ceil(total / schools)
+    return [
+        {
+            'school': f'School {number} {fake_generator.last_name()}'[:20],
+            'school_city': fake_generator.city(),
+            'school_country': fake_generator.country(),
+            'school_max_students': max_students,
+        }
+        for number in range(schools)
+    ]
+
+
+def generate_batch(pool, start, count, seed)->list:
+    """
+    Student rows `start` to `start + count`, assigned to the pool round-robin.
+    """
+    fake_generator = get_fake_generator(seed)
+    rng = random.Random(seed)
+    rows = []
+    for number in range(start, start + count):
+        row = dict(pool[number % len(pool)])
+        row.update({
+            'first_name': fake_generator.first_name(),
+            'last_name': fake_generator.last_name(),
+            'age': f'{rng.uniform(4, 15.5):.1f}',
+            'nationality': fake_generator.country(),
+            'address': fake_generator.address(),
+        })
+        rows.append(row)
+    return rows
+
+
+def generate_rows(total, schools, seed=None, workers=1, batch_size=5000):
+    """
+    Yield `total` synthetic student rows spread over `schools` schools,
+    different on every run unless a `seed` is given.
+
+    With `workers > 1` the batches are generated by a process pool and
+    yielded in order; at most two batches per worker are in flight so a
+    slow consumer bounds memory.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    pool = generate_school_pool(total, schools, seed)
+    batches = [
+        (start, min(batch_size, total - start), batch_seed(seed, number))
+        for number, start in enumerate(range(0, total, batch_size))
+    ]
+    if workers <= 1:
+        for start, count, batch in batches:
+            yield from generate_batch(pool, start, count, batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, count, batch in batches:
+            pending.append(executor.submit(generate_batch, pool, start, count, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.utils import timezone
+
+from schoolstudents.cache import bump_versions
+from schoolstudents.db.locks import bounded_lock_wait
+from schoolstudents.db.router import use_primary
+from schoolstudents.models import School, WaitlistEntry
+from schoolstudents.services.student_enrollment import bulk_enroll_students
+
+
+def promote_waitlist(school_pks)->list:
+    """
+    Enroll the oldest waiting entries of each school in its free seats.
+
+    The school rows are locked for the whole promotion, so the seats are
+    counted once and the entries of every school are enrolled with one
+    bulk insert in the caller's transaction. Returns the promoted entries.
+    """
+    with transaction.atomic(), use_primary():
+        with bounded_lock_wait():
+            schools = School.objects.select_for_update().order_by('pk').in_bulk(set(school_pks))
+        entries = []
+        for school in schools.values():
+            free = school.max_students - school.student_count
+            if free > 0:
+                entries += WaitlistEntry.objects.waiting().select_for_update().filter(
+                    school=school
+                ).order_by('pk')[:free]
+        if not entries:
+            return []
+
+        rows = [
+            (index, {'school': schools[entry.school_id], **{
+                name: getattr(entry, name) for name in WaitlistEntry.STUDENT_FIELDS
+            }})
+            for index, entry in enumerate(entries)
+        ]
+        students, _ = bulk_enroll_students(rows, schools, all_or_nothing=False)
+        promoted_at = timezone.now()
+        for entry, student in zip(entries, students):
+            entry.student = student
+            entry.promoted_at = promoted_at
+        WaitlistEntry.objects.bulk_update(entries, ['student', 'promoted_at'])
+        bump_versions('schools', 'students', *(f'school:{pk}' for pk in {entry.school_id for entry in entries}))
+    return entries
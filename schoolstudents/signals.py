@@ -0,0 +1,27 @@
+from django.core.exceptions import ValidationError
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from schoolstudents.models import Student
+from schoolstudents.query_hooks import install_execute_hooks
+from schoolstudents.services.student_validation import before_save_trigger_student
+
+
+@receiver(pre_save, sender=Student)
+def student_pre_save(sender, instance, raw=False, **kwargs):
+    """
+    Keep `School.student_count` in step with every saved student.
+    """
+    if raw:
+        return
+    previous_school_id = None
+    if not instance._state.adding:
+        previous_school_id = getattr(instance, 'previous_school_id', None)
+    if not before_save_trigger_student(instance.school, previous_school_id=previous_school_id):
+        raise ValidationError(f'Maximum students limit exceeded for {instance.school}.')
+
+
+@receiver(connection_created)
+def connection_execute_hooks(sender, connection, **kwargs):
+    install_execute_hooks(connection)
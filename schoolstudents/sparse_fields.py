@@ -0,0 +1,107 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_names(value)->list:
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer representing only the `fields` it is given, and the
+    `expand` relations with the serializer of `expandable_fields` instead
+    of a primary key. Input is validated with every field. Fields which
+    are not model fields name the ones they read in `field_sources`.
+    """
+    expandable_fields = {}
+    field_sources = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = None if fields is None else set(fields)
+        self.expand = expand
+
+    @classmethod
+    def model_fields(cls, names=None)->list:
+        """
+        Model fields read to represent the `names` fields, every field when None.
+        """
+        if names is None:
+            names = [name for name, field in cls().fields.items() if not field.write_only]
+        return [source for name in names for source in cls.field_sources.get(name, (name, ))]
+
+    @property
+    def _readable_fields(self):
+        for field in super()._readable_fields:
+            if self.selected_fields is None or field.field_name in self.selected_fields:
+                yield field
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name in self.expand:
+            if name in data:
+                related = getattr(instance, name)
+                data[name] = None if related is None else self.expandable_fields[name](
+                    related, context=self.context).data
+        return data
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=a,b` / `?exclude=c` narrow the response to those fields and
+    `?expand=school` inlines the related object, for the serializer and
+    the `values_serializer` of the list.
+
+    The list selects only the needed columns, joining the expanded tables,
+    and the detail defers the other columns with `.only()`, except the
+    `loaded_fields` needed whatever the selection.
+    """
+    loaded_fields = ('pk', )
+
+    def get_field_selection(self):
+        """
+        (field names or None for all, expanded field names) of the request.
+        """
+        if getattr(self, '_field_selection', None) is None:
+            params = self.request.query_params if self.request is not None else {}
+            available = self.values_serializer.field_names
+            fields = parse_names(params.get('fields', ''))
+            exclude = parse_names(params.get('exclude', ''))
+            expand = parse_names(params.get('expand', ''))
+            errors = {}
+            for param, names, known in (
+                ('fields', fields, available), ('exclude', exclude, available),
+                ('expand', expand, self.values_serializer.expandable),
+            ):
+                unknown = [name for name in names if name not in known]
+                if unknown:
+                    errors[param] = [f'Unknown field(s): {", ".join(unknown)}.']
+            if errors:
+                raise ValidationError(errors)
+
+            selected = None
+            if fields or exclude:
+                selected = [name for name in fields or available if name not in exclude]
+            self._field_selection = (selected, tuple(expand))
+        return self._field_selection
+
+    def get_values_serializer(self):
+        return self.values_serializer.select(*self.get_field_selection())
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'], kwargs['expand'] = self.get_field_selection()
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        """
+        Load only the columns of the selected fields of a retrieved object.
+        """
+        queryset = super().get_queryset()
+        fields, expand = self.get_field_selection()
+        if self.action != 'retrieve' or fields is None:
+            return queryset.select_related(*expand) if expand else queryset
+        serializer_class = self.get_serializer_class()
+        expand = [name for name in expand if name in fields]
+        only = [*self.loaded_fields, *serializer_class.model_fields(fields)]
+        for name in expand:
+            only += [f'{name}__{column}' for column in serializer_class.expandable_fields[name].model_fields()]
+        return queryset.select_related(None).select_related(*expand).only(*only)
@@ -0,0 +1,65 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+@override_settings(ROOT_URLCONF='manatal_challenge.asgi_urls', RESPONSE_CACHE_ENABLED=True)
+class AsyncReadViewsTestCase(APITestCase):
+    def setUp(self):
+        self.school = SchoolFactory(max_students=40)
+        self.students = StudentFactory.create_batch(30, school=self.school)
+
+    async def assert_same_as_sync(self, url, **params):
+        response = await self.async_client.get(url, params)
+        with override_settings(ROOT_URLCONF='manatal_challenge.urls'):
+            expected = await self.async_client.get(url, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response['Content-Type'], expected['Content-Type'])
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        return response
+
+    async def test_school_reads(self):
+        await self.assert_same_as_sync(reverse('schoolstudents:schools-list'))
+        await self.assert_same_as_sync(reverse('schoolstudents:schools-list'), search=self.school.name)
+        await self.assert_same_as_sync(reverse('schoolstudents:schools-detail', args=[self.school.pk]))
+
+    async def test_student_reads(self):
+        url = reverse('schoolstudents:students-list')
+        response = await self.assert_same_as_sync(url, page=2, ordering='-age')
+        self.assertEqual(len(json.loads(response.content)['results']), 5)
+        await self.assert_same_as_sync(reverse('schoolstudents:students-detail', args=[self.students[0].pk]))
+        await self.assert_same_as_sync(reverse('schoolstudents:school-students-list', args=[self.school.pk]))
+        await self.assert_same_as_sync(
+            reverse('schoolstudents:school-students-detail', args=[self.school.pk, self.students[1].pk]))
+
+    async def test_not_found(self):
+        await self.assert_same_as_sync(reverse('schoolstudents:students-list'), page=5)
+        response = await self.assert_same_as_sync(reverse('schoolstudents:students-detail', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_cursor_pagination_uses_the_regular_view(self):
+        response = await self.assert_same_as_sync(
+            reverse('schoolstudents:students-list'), pagination='cursor', ordering='last_name')
+        self.assertIn('cursor=', json.loads(response.content)['next'])
+
+    async def test_response_cache_is_shared(self):
+        url = reverse('schoolstudents:schools-detail', args=[self.school.pk])
+        response = await self.async_client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        with override_settings(ROOT_URLCONF='manatal_challenge.urls'):
+            expected = await self.async_client.get(url)
+        self.assertEqual(expected['X-Cache'], 'HIT')
+        self.assertEqual(expected['ETag'], response['ETag'])
+
+    async def test_writes_use_the_regular_view(self):
+        response = await self.async_client.patch(
+            reverse('schoolstudents:students-detail', args=[self.students[0].pk]),
+            {'last_name': 'Async'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['last_name'], 'Async')
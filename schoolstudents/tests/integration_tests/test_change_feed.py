@@ -0,0 +1,104 @@
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import Change
+from schoolstudents.tests.factories import SchoolFactory
+
+
+class ChangeFeedAPITestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('schoolstudents:changes-list')
+        self.school = SchoolFactory(max_students=5)
+        self.data = {
+            'first_name': 'John', 'last_name': 'Wick', 'age': '5.0',
+            'nationality': 'Bangladesh', 'school': self.school.pk,
+        }
+
+    def events(self, response):
+        return [(change['model'], change['object_id'], change['action']) for change in response.data['changes']]
+
+    def test_writes_are_recorded_in_order(self):
+        student = self.client.post(reverse('schoolstudents:students-list'), self.data, format='json').data
+        self.client.patch(reverse('schoolstudents:students-detail', args=[student['id']]), {'age': '6.0'}, format='json')
+        rows = [dict(self.data, first_name=name) for name in ('Jane', 'Jim')]
+        bulk = self.client.post(
+            reverse('schoolstudents:school-students-bulk', args=[self.school.pk]), rows, format='json').data
+        self.client.delete(reverse('schoolstudents:students-detail', args=[student['id']]))
+        self.client.delete(reverse('schoolstudents:schools-detail', args=[self.school.pk]))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        bulk_ids = sorted(row['id'] for row in bulk['created'])
+        self.assertEqual(self.events(response), [
+            ('school', self.school.pk, Change.CREATE),
+            ('student', student['id'], Change.CREATE),
+            ('student', student['id'], Change.UPDATE),
+            *(('student', pk, Change.CREATE) for pk in bulk_ids),
+            ('student', student['id'], Change.DELETE),
+            *(('student', pk, Change.DELETE) for pk in bulk_ids),
+            ('school', self.school.pk, Change.DELETE),
+        ])
+        update = response.data['changes'][2]
+        self.assertEqual((update['school'], update['data']['age']), (self.school.pk, '6.00'))
+        self.assertIsNone(response.data['changes'][-1]['data'])
+        self.assertFalse(response.data['more'])
+
+    def test_cursor(self):
+        for name in ('Jane', 'Jim', 'Joe'):
+            self.client.post(reverse('schoolstudents:students-list'), dict(self.data, first_name=name), format='json')
+
+        first = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(len(first.data['changes']), 2)
+        self.assertTrue(first.data['more'])
+        second = self.client.get(self.url, {'since': first.data['cursor'], 'limit': 2})
+        self.assertEqual([change['data']['first_name'] for change in second.data['changes']], ['Jim', 'Joe'])
+        last = self.client.get(self.url, {'since': second.data['cursor']})
+        self.assertEqual((last.data['changes'], last.data['cursor']), ([], second.data['cursor']))
+
+    def test_invalid_parameters(self):
+        for params in ({'since': 'abc'}, {'limit': 0}, {'wait': 'soon'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_wsgi_does_not_wait_by_default(self):
+        cursor = self.client.get(self.url).data['cursor']
+        started = time.monotonic()
+        response = self.client.get(self.url, {'since': cursor, 'wait': 10})
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual((response.data['changes'], response.data['cursor']), ([], cursor))
+
+    @override_settings(CHANGE_FEED_POLL_INTERVAL=0.05, CHANGE_FEED_SYNC_LONG_POLL=True)
+    def test_long_poll_times_out(self):
+        cursor = self.client.get(self.url).data['cursor']
+        started = time.monotonic()
+        response = self.client.get(self.url, {'since': cursor, 'wait': 0.2})
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual((response.data['changes'], response.data['cursor']), ([], cursor))
+
+    def test_long_poll_returns_ready_changes(self):
+        started = time.monotonic()
+        response = self.client.get(self.url, {'wait': 10})
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(self.events(response), [('school', self.school.pk, Change.CREATE)])
+
+
+@override_settings(ROOT_URLCONF='manatal_challenge.asgi_urls', CHANGE_FEED_POLL_INTERVAL=0.05)
+class AsyncChangeFeedTestCase(APITestCase):
+    async def test_long_poll(self):
+        school = await sync_to_async(SchoolFactory)(max_students=5)
+        url = reverse('schoolstudents:changes-list')
+        response = await self.async_client.get(url, {'wait': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = json.loads(response.content)
+        self.assertEqual([change['object_id'] for change in body['changes']], [school.pk])
+
+        response = await self.async_client.get(url, {'since': body['cursor'], 'wait': 0.1})
+        self.assertEqual(json.loads(response.content)['changes'], [])
+        response = await self.async_client.get(url, {'since': 'abc', 'wait': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+from schoolstudents.models import School, SchoolQuerySet, Student
+from schoolstudents.tests.factories import SchoolFactory
+
+
+class LockTimeoutAPITestCase(APITestCase):
+    def test_lock_timeout_is_a_conflict(self):
+        school = SchoolFactory(max_students=5)
+        data = {'first_name': 'John', 'last_name': 'Doe', 'age': '10.0', 'nationality': 'Thai', 'school': school.pk}
+        with mock.patch.object(SchoolQuerySet, 'admit_student', side_effect=OperationalError('database is locked')):
+            response = self.client.post(reverse('schoolstudents:students-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT, response.data)
+        self.assertEqual(response.data['detail'].code, 'lock_timeout')
+        self.assertFalse(Student.objects.exists())
+
+
+class ConcurrentEnrollmentTestCase(APITransactionTestCase):
+    """
+    Hundreds of simultaneous writes at one school; the capacity must hold
+    whatever the interleaving.
+    """
+    requests = 200
+    threads = 20
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Concurrent writers need a database file or server.')
+        self.school = SchoolFactory(max_students=50)
+
+    def create(self, number):
+        data = {
+            'first_name': f'Student{number}', 'last_name': 'Doe', 'age': '10.0',
+            'nationality': 'Thai', 'school': self.school.pk,
+        }
+        try:
+            return APIClient().post(reverse('schoolstudents:students-list'), data, format='json').status_code
+        finally:
+            connection.close()
+
+    def run_concurrently(self, calls):
+        with ThreadPoolExecutor(self.threads) as executor:
+            return list(executor.map(lambda call: call(), calls))
+
+    def assert_capacity_holds(self):
+        school = School.objects.get(pk=self.school.pk)
+        enrolled = Student.objects.filter(school=school).count()
+        self.assertEqual(school.student_count, enrolled)
+        self.assertLessEqual(enrolled, school.max_students)
+        return school, enrolled
+
+    def test_creates_never_exceed_capacity(self):
+        started = time.perf_counter()
+        statuses = self.run_concurrently([lambda number=number: self.create(number) for number in range(self.requests)])
+        throughput = self.requests / (time.perf_counter() - started)
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 50)
+        self.assertLessEqual(
+            set(statuses), {status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST, status.HTTP_409_CONFLICT})
+        self.assert_capacity_holds()
+        self.assertGreater(throughput, 0)
+
+    def test_lowering_max_students_during_creates(self):
+        lowered = threading.Event()
+
+        def lower():
+            url = reverse('schoolstudents:schools-detail', args=[self.school.pk])
+            try:
+                return APIClient().patch(url, {'max_students': 20}, format='json').status_code
+            finally:
+                lowered.set()
+                connection.close()
+
+        calls = [lambda number=number: self.create(number) for number in range(self.requests)]
+        calls.insert(self.requests // 10, lower)
+        statuses = self.run_concurrently(calls)
+        self.assertTrue(lowered.is_set())
+
+        school, enrolled = self.assert_capacity_holds()
+        if statuses[self.requests // 10] == status.HTTP_200_OK:
+            self.assertEqual(school.max_students, 20)
@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import Change, School, Student
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class ConditionalUpdateAPITestCase(APITestCase):
+    def setUp(self):
+        self.school = SchoolFactory(max_students=5)
+        self.student = StudentFactory(school=self.school)
+        self.school_url = reverse('schoolstudents:schools-detail', args=[self.school.pk])
+        self.student_url = reverse('schoolstudents:students-detail', args=[self.student.pk])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_detail_etag_is_the_version(self):
+        response = self.client.get(self.student_url)
+        self.assertEqual(response['ETag'], f'"{self.student.version}"')
+        self.assertEqual(response.data['version'], self.student.version)
+        response = self.client.get(self.student_url, {'fields': 'first_name'})
+        self.assertEqual(response['ETag'], f'"{self.student.version}"')
+
+        etag = self.client.get(self.school_url)['ETag']
+        self.assertEqual(etag, f'"{School.objects.get(pk=self.school.pk).version}"')
+        response = self.client.get(self.school_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_plain_update_is_one_conditional_update(self):
+        etag = self.client.get(self.student_url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.student_url, {'last_name': 'Doe'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        statements = [query['sql'] for query in queries if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertTrue(statements[0].startswith('UPDATE'), statements)
+        self.assertIn('"version" IN', statements[0])
+        self.assertEqual(response.data['version'], self.student.version + 1)
+        self.assertEqual(response['ETag'], f'"{self.student.version + 1}"')
+        self.assertEqual(Change.objects.filter(model='student', action=Change.UPDATE).count(), 1)
+
+        response = self.client.patch(self.student_url, {'last_name': 'Smith'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED, response.data)
+        self.assertEqual(Student.objects.get(pk=self.student.pk).last_name, 'Doe')
+
+    def test_other_updates_check_the_version(self):
+        etag = self.client.get(self.school_url)['ETag']
+        response = self.client.patch(self.school_url, {'max_students': 3}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response['ETag'], f'"{response.data["version"]}"')
+        response = self.client.patch(self.school_url, {'max_students': 4}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED, response.data)
+        self.assertEqual(School.objects.get(pk=self.school.pk).max_students, 3)
+
+        etag = self.client.get(self.student_url)['ETag']
+        response = self.client.patch(self.student_url, {'age': '7.0'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        response = self.client.patch(self.student_url, {'age': '8.0'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED, response.data)
+
+    def test_enrollment_changes_the_school_version(self):
+        etag = self.client.get(self.school_url)['ETag']
+        StudentFactory(school=self.school)
+        response = self.client.patch(self.school_url, {'name': 'Renamed'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED, response.data)
+
+    def test_without_if_match(self):
+        response = self.client.patch(self.school_url, {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['version'], School.objects.get(pk=self.school.pk).version)
+        response = self.client.patch(self.school_url, {'name': 'Renamed'}, format='json', HTTP_IF_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+    def test_invalid_if_match(self):
+        response = self.client.patch(self.school_url, {'name': 'Renamed'}, format='json', HTTP_IF_MATCH='"abc"')
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED, response.data)
+        url = reverse('schoolstudents:schools-detail', args=[self.school.pk + 100])
+        response = self.client.patch(url, {'name': 'Renamed'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.data)
+        response = self.client.patch(self.school_url, {'name': 'x' * 30}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
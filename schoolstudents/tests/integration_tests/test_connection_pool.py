@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase
+
+from schoolstudents import metrics
+from schoolstudents.db.backends.sqlite3.base import DatabaseWrapper
+from schoolstudents.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, usable=True):
+        self.usable = usable
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def test_connections_are_reused(self):
+        pool = ConnectionPool('test', max_size=2)
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        self.assertIs(pool.checkout(FakeConnection), first)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        pool = ConnectionPool('test', max_size=1, timeout=5)
+        first = pool.checkout(FakeConnection)
+        threading.Timer(0.05, pool.checkin, [first]).start()
+        self.assertIs(pool.checkout(FakeConnection), first)
+        self.assertEqual(pool.stats()['wait'], 1)
+
+    def test_checkout_times_out(self):
+        pool = ConnectionPool('test', max_size=1, timeout=0.01)
+        pool.checkout(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        self.assertEqual(pool.stats()['timeout'], 1)
+
+    def test_idle_connections_expire_down_to_min_size(self):
+        pool = ConnectionPool('test', min_size=1, max_size=3, max_idle=60)
+        connections = [pool.checkout(FakeConnection) for _ in range(3)]
+        for connection in connections:
+            pool.checkin(connection)
+        with mock.patch('schoolstudents.db.pool.time.monotonic', return_value=10 ** 6):
+            pool.checkout(FakeConnection)
+        self.assertEqual([connection.closed for connection in connections], [True, True, False])
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_broken_connections_are_replaced(self):
+        pool = ConnectionPool('test', check=lambda connection: connection.usable)
+        broken = pool.checkout(lambda: FakeConnection(usable=False))
+        pool.checkin(broken)
+        self.assertIsNot(pool.checkout(FakeConnection), broken)
+        self.assertTrue(broken.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool('test', max_size=1, timeout=0.01)
+        with self.assertRaises(RuntimeError):
+            pool.checkout(mock.Mock(side_effect=RuntimeError))
+        self.assertIsInstance(pool.checkout(FakeConnection), FakeConnection)
+
+
+class PooledBackendTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'pooled.sqlite3')
+
+    def make_wrapper(self, alias, **pool):
+        settings_dict = dict(connection.settings_dict, NAME=self.name, POOL=pool)
+        wrapper = DatabaseWrapper(settings_dict, alias=alias)
+        self.addCleanup(wrapper.pool.close)
+        return wrapper
+
+    def test_closed_connections_go_back_to_the_pool(self):
+        first, second = self.make_wrapper('pooled'), self.make_wrapper('pooled')
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+        second.close()
+
+        stats = second.pool.stats()
+        self.assertEqual((stats['created'], stats['checkout'], stats['idle']), (1, 2, 1))
+        self.assertIn('schoolstudents_db_pool_events_total{alias="pooled",event="created"} 1', metrics.expose())
+
+    def test_exhausted_pool_raises_operational_error(self):
+        first, second = self.make_wrapper('exhausted', MAX_SIZE=1, TIMEOUT=0.01), self.make_wrapper('exhausted')
+        first.ensure_connection()
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+        first.close()
+
+
+class PooledBackendImportTestCase(SimpleTestCase):
+    def test_backends_import_first(self):
+        """
+        Django imports the backend before the app, as with `DB_POOL=True`.
+        """
+        for backend in ('postgresql', 'sqlite3'):
+            with self.subTest(backend=backend):
+                subprocess.run(
+                    [sys.executable, '-c', f'import schoolstudents.db.backends.{backend}.base'],
+                    check=True, capture_output=True,
+                    env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'manatal_challenge.settings'},
+                )
@@ -0,0 +1,102 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class CursorPaginationAPITestCase(APITestCase):
+    def collect_pages(self, url):
+        results, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            self.assertNotIn('count', response.data)
+            results.extend(response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return results, pages
+
+    def test_student_cursor_pagination_with_ordering(self):
+        for age in (5, 6, 7):
+            school = SchoolFactory(max_students=20)
+            StudentFactory.create_batch(10, school=school, age=age)
+        url = reverse('schoolstudents:students-list') + '?pagination=cursor&ordering=-age'
+        results, pages = self.collect_pages(url)
+        self.assertEqual(pages, 2)
+        self.assertEqual(len({student['id'] for student in results}), 30)
+        self.assertEqual(
+            [(student['age'], student['id']) for student in results],
+            sorted(((s['age'], s['id']) for s in results), key=lambda key: (-float(key[0]), -key[1]))
+        )
+
+    def test_pages_are_keyset_filtered(self):
+        school = SchoolFactory(max_students=60)
+        StudentFactory.create_batch(60, school=school, age=6)
+        url = reverse('schoolstudents:students-list') + '?pagination=cursor&ordering=age'
+        first = self.client.get(url).data
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(first['next']).data
+        sql = queries[-1]['sql']
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('"schoolstudents_student"."id" >', sql)
+        self.assertEqual(second['results'][0]['id'], first['results'][-1]['id'] + 1)
+
+        third = self.client.get(second['next']).data
+        self.assertEqual(len(third['results']), 10)
+        self.assertIsNone(third['next'])
+        previous = self.client.get(third['previous']).data
+        self.assertEqual(previous['results'], second['results'])
+        previous = self.client.get(previous['previous']).data
+        self.assertEqual(previous['results'], first['results'])
+        self.assertIsNone(previous['previous'])
+
+    def test_every_ordering_field_is_kept(self):
+        school = SchoolFactory(max_students=40)
+        for last_name in ('Doe', 'Roe'):
+            for number in range(15):
+                StudentFactory(school=school, last_name=last_name, first_name=f'Name {number % 4}')
+        url = reverse('schoolstudents:students-list') + '?pagination=cursor&ordering=last_name,-first_name'
+        results, pages = self.collect_pages(url)
+        self.assertEqual(pages, 2)
+        keys = [(student['last_name'], student['first_name'], student['id']) for student in results]
+        expected = sorted(sorted(keys, key=lambda key: key[2], reverse=True), key=lambda key: key[1], reverse=True)
+        self.assertEqual(keys, sorted(expected, key=lambda key: key[0]))
+        self.assertEqual(len(set(keys)), 30)
+
+    def test_invalid_cursor(self):
+        url = reverse('schoolstudents:schools-list') + '?pagination=cursor&cursor=bad'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_student_cursor_pagination_by_school_name(self):
+        for name in ('b', 'a', 'c'):
+            StudentFactory.create_batch(10, school=SchoolFactory(name=name, max_students=20))
+        url = reverse('schoolstudents:students-list') + '?pagination=cursor&ordering=school__name'
+        results, _ = self.collect_pages(url)
+        self.assertEqual(len({student['id'] for student in results}), 30)
+
+    def test_school_student_cursor_pagination(self):
+        school = SchoolFactory(max_students=20)
+        StudentFactory.create_batch(3, school=school)
+        StudentFactory()
+        url = reverse('schoolstudents:school-students-list', kwargs={'school_pk': school.pk})
+        results, _ = self.collect_pages(url + '?pagination=cursor')
+        self.assertEqual(len(results), 3)
+
+    def test_school_cursor_pagination_count_switch(self):
+        SchoolFactory.create_batch(3)
+        url = reverse('schoolstudents:schools-list') + '?pagination=cursor&ordering=name'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertNotIn('count', response.data)
+
+        response = self.client.get(url + '&count=true')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_page_number_pagination_stays_default(self):
+        SchoolFactory()
+        response = self.client.get(reverse('schoolstudents:schools-list'))
+        self.assertEqual(response.data['count'], 1)
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from schoolstudents.fast_serializers import ValuesRowSerializer
+from schoolstudents.models import School, Student
+from schoolstudents.renderers import FastJSONRenderer
+from schoolstudents.serializers import SchoolSerializer, StudentSerializer
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+from schoolstudents.views import SchoolModelViewSet
+
+
+class FastSerializerParityTestCase(APITestCase):
+    """
+    The `.values()` list path must produce byte-identical responses to the
+    ModelSerializer + JSONRenderer path it replaces.
+    """
+    def setUp(self):
+        school = SchoolFactory(name='a "quoted" \\ école', max_students=3, address='line\nbreak ')
+        StudentFactory(school=school, first_name='a 😀', age='5.5', address='')
+        StudentFactory(school=school, first_name='b \t tab', age='12.25')
+        StudentFactory(school=SchoolFactory(name='b', max_students=1), first_name='c', age=7)
+
+    def expected_content(self, serializer_class, queryset):
+        return JSONRenderer().render(OrderedDict([
+            ('count', queryset.count()),
+            ('next', None),
+            ('previous', None),
+            ('results', serializer_class(queryset, many=True).data),
+        ]))
+
+    def test_school_list_parity(self):
+        response = self.client.get(reverse('schoolstudents:schools-list'), {'ordering': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        expected = self.expected_content(SchoolSerializer, School.objects.order_by('name'))
+        self.assertEqual(response.content, expected)
+
+    def test_student_list_parity(self):
+        response = self.client.get(reverse('schoolstudents:students-list'), {'ordering': 'first_name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        expected = self.expected_content(StudentSerializer, Student.objects.order_by('first_name'))
+        self.assertEqual(response.content, expected)
+
+    def test_values_row_serializer_parity(self):
+        for serializer_class, queryset, values_serializer in (
+            (StudentSerializer, Student.objects.order_by('pk'), ValuesRowSerializer(StudentSerializer)),
+            (SchoolSerializer, School.objects.order_by('pk'), SchoolModelViewSet.values_serializer),
+        ):
+            expected = serializer_class(queryset, many=True).data
+            data = values_serializer.to_representation(values_serializer.values(queryset))
+            self.assertEqual(data, expected)
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(expected))
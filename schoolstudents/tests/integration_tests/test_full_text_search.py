@@ -0,0 +1,32 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class FullTextSearchAPITestCase(APITestCase):
+    def search(self, **params):
+        response = self.client.get(reverse('schoolstudents:search-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data['results']
+
+    def test_search_students(self):
+        StudentFactory(first_name='Hulk', last_name='Hogan', nationality='American')
+        StudentFactory(first_name='John', last_name='Cena', nationality='American')
+        StudentFactory(first_name='Rock', last_name='Johnson', address='Hulk street')
+        results = self.search(q='hulk')
+        self.assertEqual({student['first_name'] for student in results}, {'Hulk', 'Rock'})
+        results = self.search(q='american')
+        self.assertEqual(len(results), 2)
+
+    def test_search_schools(self):
+        SchoolFactory(name='Green Herald', city='Dhaka', country='Bangladesh')
+        SchoolFactory(name='Scholastica', city='Chittagong', country='Bangladesh')
+        results = self.search(q='dhaka', type='schools')
+        self.assertEqual([school['name'] for school in results], ['Green Herald'])
+        self.assertNotIn('search_vector', results[0])
+
+    def test_search_invalid_type(self):
+        response = self.client.get(reverse('schoolstudents:search-list'), {'q': 'a', 'type': 'teachers'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
@@ -0,0 +1,128 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+
+from schoolstudents.models import IdempotencyKey, SchoolQuerySet, Student
+from schoolstudents.tests.factories import SchoolFactory
+
+
+class IdempotencyAPITestCase(APITestCase):
+    def setUp(self):
+        self.school = SchoolFactory(max_students=1)
+        self.data = {
+            'first_name': 'John', 'last_name': 'Wick', 'age': '5.0',
+            'nationality': 'Bangladesh', 'school': self.school.pk,
+        }
+
+    def post(self, url, data, key='key-1'):
+        return self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_create_is_replayed(self):
+        url = reverse('schoolstudents:students-list')
+        first, retry = self.post(url, self.data), self.post(url, self.data)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED, first.data)
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(Student.objects.count(), 1)
+        self.school.refresh_from_db()
+        self.assertEqual(self.school.student_count, 1)
+
+    def test_client_errors_are_replayed(self):
+        url = reverse('schoolstudents:students-list')
+        self.post(url, self.data, key='other')
+        first, retry = self.post(url, self.data), self.post(url, self.data)
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST, first.data)
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_lock_timeouts_are_not_stored(self):
+        url = reverse('schoolstudents:students-list')
+        with mock.patch.object(SchoolQuerySet, 'admit_student', side_effect=OperationalError('database is locked')):
+            first = self.post(url, self.data)
+        self.assertEqual(first.status_code, status.HTTP_409_CONFLICT, first.data)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        retry = self.post(url, self.data)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED, retry.data)
+        self.assertNotIn('Idempotent-Replayed', retry)
+
+    def test_key_reused_with_other_parameters(self):
+        source = SchoolFactory(max_students=5)
+        student = Student.objects.create(school=source, **{
+            key: value for key, value in self.data.items() if key != 'school'})
+        url = reverse('schoolstudents:school-students-transfer', args=[source.pk])
+        data = {'students': [student.pk], 'school': self.school.pk}
+        self.post(url, data)
+        response = self.post(url + '?mode=partial', data)
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY, response.data)
+
+    def test_key_reused_for_another_request(self):
+        url = reverse('schoolstudents:students-list')
+        self.post(url, self.data)
+        response = self.post(url, dict(self.data, first_name='Jane'))
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY, response.data)
+        self.assertEqual(Student.objects.count(), 1)
+
+    def test_requests_without_key_are_not_stored(self):
+        self.client.post(reverse('schoolstudents:students-list'), self.data, format='json')
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_retried_bulk_is_replayed(self):
+        url = reverse('schoolstudents:school-students-bulk', args=[self.school.pk])
+        rows = [{key: value for key, value in self.data.items() if key != 'school'}]
+        first, retry = self.post(url, rows), self.post(url, rows)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED, first.data)
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(Student.objects.count(), 1)
+
+    def test_expired_keys(self):
+        url = reverse('schoolstudents:students-list')
+        self.post(url, self.data)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.school.max_students = 2
+        self.school.save()
+        response = self.post(url, self.data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Student.objects.count(), 2)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        out = StringIO()
+        call_command('purge_idempotency_keys', stdout=out)
+        self.assertIn('1 expired idempotency key(s) deleted.', out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class ConcurrentIdempotencyTestCase(APITransactionTestCase):
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Concurrent writers need a database file or server.')
+
+    def test_concurrent_duplicates_create_once(self):
+        school = SchoolFactory(max_students=5)
+        data = {'first_name': 'John', 'last_name': 'Wick', 'age': '5.0', 'nationality': 'Thai', 'school': school.pk}
+        responses = []
+
+        def post():
+            try:
+                responses.append(APIClient().post(
+                    reverse('schoolstudents:students-list'), data, format='json', HTTP_IDEMPOTENCY_KEY='key-1'))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_201_CREATED] * 4)
+        self.assertEqual(sum(response.has_header('Idempotent-Replayed') for response in responses), 3)
+        self.assertEqual(Student.objects.count(), 1)
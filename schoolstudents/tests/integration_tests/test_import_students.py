@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from schoolstudents.models import Change, School, Student
+from schoolstudents.services.student_enrollment import COPY_COLUMNS
+from schoolstudents.services.synthetic_data import generate_rows
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class ImportStudentsCommandTestCase(TestCase):
+    def write_file(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def import_students(self, *args, **kwargs):
+        out, err = StringIO(), StringIO()
+        call_command('import_students', *args, stdout=out, stderr=err, **kwargs)
+        return out.getvalue(), err.getvalue()
+
+    def test_copy_writes_every_required_column(self):
+        required = {
+            field.column for field in Student._meta.concrete_fields
+            if not field.null and not field.primary_key
+        }
+        self.assertEqual(required - set(COPY_COLUMNS), set())
+
+    def test_import_csv(self):
+        school = SchoolFactory(name='Green Herald', max_students=5)
+        path = self.write_file('.csv', (
+            'school,first_name,last_name,age,nationality,address\n'
+            'Green Herald,John,Cena,5.5,Bangladesh,Dhaka\n'
+            'Green Herald,John,Wick,6,Bangladesh,\n'
+        ))
+        out, _ = self.import_students(path)
+        school.refresh_from_db()
+        self.assertIn('Imported 2 of 2 students', out)
+        self.assertEqual(school.student_count, 2)
+        self.assertEqual(set(school.students.values_list('last_name', flat=True)), {'Cena', 'Wick'})
+
+    def test_import_ndjson_creates_schools_and_enforces_capacity(self):
+        StudentFactory(school=SchoolFactory(name='Full', max_students=1))
+        rows = [
+            {'school': 'New', 'school_city': 'Dhaka', 'school_country': 'Bangladesh',
+             'school_max_students': 2, 'first_name': f'Student {number}', 'last_name': 'New',
+             'age': '7.0', 'nationality': 'Bangladesh'}
+            for number in range(3)
+        ]
+        rows.append({'school': 'Full', 'first_name': 'John', 'last_name': 'Wick', 'age': 5,
+                     'nationality': 'Bangladesh'})
+        path = self.write_file('.ndjson', '\n'.join(json.dumps(row) for row in rows))
+        out, _ = self.import_students(path, chunk_size=2)
+
+        school = School.objects.get(name='New')
+        self.assertEqual((school.city, school.max_students, school.student_count), ('Dhaka', 2, 2))
+        self.assertEqual(School.objects.get(name='Full').student_count, 1)
+        self.assertIn('Imported 2 of 4 students', out)
+        self.assertIn('2 over capacity', out)
+
+    def test_import_reports_invalid_rows(self):
+        SchoolFactory(name='Green Herald', max_students=5)
+        path = self.write_file('.csv', (
+            'school,first_name,last_name,age,nationality\n'
+            'Unknown,John,Cena,5.5,Bangladesh\n'
+            'Green Herald,John,Wick,,Bangladesh\n'
+            'Green Herald,John,Doe,abc,Bangladesh\n'
+        ))
+        out, err = self.import_students(path)
+        self.assertEqual(Student.objects.count(), 0)
+        self.assertIn('3 invalid', out)
+        self.assertIn('Row 1: Unknown school "Unknown".', err)
+        self.assertIn('Row 2: age is required.', err)
+
+    def test_import_reports_invalid_schools(self):
+        path = self.write_file('.csv', (
+            'school,school_city,school_country,school_max_students,first_name,last_name,age,nationality\n'
+            'Broken,Dhaka,Bangladesh,many,John,Cena,5.5,Bangladesh\n'
+            'New,Dhaka,Bangladesh,3,John,Wick,6,Bangladesh\n'
+            'New,Dhaka,Bangladesh,3,John,Doe,6,Bangladesh\n'
+            'New,Khulna,Bangladesh,3,Jane,Doe,6,Bangladesh\n'
+        ))
+        out, err = self.import_students(path)
+        self.assertIn('Imported 2 of 4 students', out)
+        self.assertIn('2 invalid', out)
+        self.assertIn('Row 1: ', err)
+        self.assertIn('Row 4: School "New" differs from row 2.', err)
+        school = School.objects.get()
+        self.assertEqual((school.name, school.city, school.student_count), ('New', 'Dhaka', 2))
+        self.assertEqual(
+            list(Change.objects.filter(model='school').values_list('object_id', 'action')),
+            [(school.pk, Change.CREATE)],
+        )
+
+    def test_import_synthetic(self):
+        out, _ = self.import_students(synthetic=30, schools=3, seed=1, chunk_size=7)
+        self.assertEqual(Student.objects.count(), 30)
+        self.assertEqual(
+            sorted(School.objects.values_list('student_count', flat=True)), [10, 10, 10]
+        )
+        self.assertIn('rows/s', out)
+
+    def test_synthetic_rows_do_not_depend_on_workers(self):
+        rows = list(generate_rows(25, 2, seed=7, batch_size=4))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows, list(generate_rows(25, 2, seed=7, workers=3, batch_size=4)))
+        self.assertNotEqual(rows, list(generate_rows(25, 2, seed=8, batch_size=4)))
+
+    def test_synthetic_rows_without_seed_are_random(self):
+        self.assertNotEqual(list(generate_rows(10, 2, batch_size=4)), list(generate_rows(10, 2, batch_size=4)))
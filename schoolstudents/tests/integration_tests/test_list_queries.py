@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class ListQueriesAPITestCase(APITestCase):
+    """
+    Every list page must cost the same number of queries however many rows
+    it holds: one COUNT for the paginator and one SELECT for the page.
+    """
+    def assertListQueries(self, url, num):
+        # Rows are created behind the API's back, skip the response cache.
+        cache.clear()
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response
+
+    def test_school_list_queries(self):
+        school = SchoolFactory(max_students=20)
+        StudentFactory.create_batch(3, school=school)
+        url = reverse('schoolstudents:schools-list')
+        self.assertListQueries(url, 2)
+
+        SchoolFactory.create_batch(20)
+        response = self.assertListQueries(url + '?ordering=name', 2)
+        self.assertEqual(len(response.data['results']), 21)
+
+    def test_school_list_exposes_capacity(self):
+        school = SchoolFactory(max_students=5)
+        StudentFactory.create_batch(2, school=school)
+        url = reverse('schoolstudents:schools-detail', args=[school.pk])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['student_count'], 2)
+        self.assertEqual(response.data['remaining_capacity'], 3)
+
+    def test_student_list_queries(self):
+        StudentFactory()
+        url = reverse('schoolstudents:students-list') + '?ordering=school__name'
+        self.assertListQueries(url, 2)
+
+        for _ in range(10):
+            StudentFactory.create_batch(2, school=SchoolFactory(max_students=5))
+        response = self.assertListQueries(url, 2)
+        self.assertEqual(len(response.data['results']), 21)
+
+    def test_school_student_list_queries(self):
+        school = SchoolFactory(max_students=20)
+        StudentFactory(school=school)
+        url = reverse('schoolstudents:school-students-list', kwargs={'school_pk': school.pk})
+        self.assertListQueries(url, 2)
+
+        StudentFactory.create_batch(15, school=school)
+        response = self.assertListQueries(url, 2)
+        self.assertEqual(len(response.data['results']), 16)
@@ -0,0 +1,54 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents import metrics
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class QueryTimingMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_server_timing_header(self):
+        StudentFactory.create_batch(3, school=SchoolFactory(max_students=5))
+        response = self.client.get(reverse('schoolstudents:students-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        entries = dict(entry.split(';', 1) for entry in response['Server-Timing'].split(', '))
+        self.assertEqual(set(entries), {'db', 'serialize', 'total'})
+        self.assertIn('desc="2 queries"', entries['db'])
+
+    def test_metrics_are_aggregated_per_view(self):
+        school = SchoolFactory()
+        self.client.get(reverse('schoolstudents:schools-list'))
+        self.client.get(reverse('schoolstudents:schools-detail', args=[school.pk]))
+        self.client.get(reverse('schoolstudents:schools-detail', args=[school.pk]))
+
+        response = self.client.get(reverse('schoolstudents:metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE schoolstudents_request_duration_seconds histogram', body)
+        self.assertIn(
+            'schoolstudents_request_duration_seconds_count{view="schoolstudents:schools-detail",method="GET"} 2',
+            body,
+        )
+        self.assertIn(
+            'schoolstudents_db_queries_bucket{view="schoolstudents:schools-list",method="GET",le="2"} 1', body)
+        self.assertIn('schoolstudents_response_cache_total{result="hit"}', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_metrics_are_internal(self):
+        response = self.client.get(reverse('schoolstudents:metrics'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        url = reverse('schoolstudents:metrics')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer other')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer secret', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
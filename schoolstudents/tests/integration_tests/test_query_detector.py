@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import Student
+from schoolstudents.query_detector import QueryDetector, QueryDetectorError, normalize_sql
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+from schoolstudents.views import StudentModelViewSet
+
+
+def school_names(self, request, *args, **kwargs):
+    return Response([student.school.name for student in Student.objects.all()])
+
+
+class QueryDetectorTestCase(APITestCase):
+    def setUp(self):
+        for _ in range(5):
+            StudentFactory(school=SchoolFactory())
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql('SELECT *  FROM "student"\n WHERE "id" IN (1, 2, 3) AND "name" = \'it\'\'s\' LIMIT 21'),
+            'SELECT * FROM "student" WHERE "id" IN (...) AND "name" = ? LIMIT ?',
+        )
+
+    def test_repeated_query_shape(self):
+        detector = QueryDetector(repeat_threshold=5, slow_ms=10000)
+        with detector.watch():
+            [student.school.name for student in Student.objects.all()]
+
+        [(count, shape, location)] = detector.repeated()
+        self.assertEqual(count, 5)
+        self.assertIn('FROM "schoolstudents_school"', shape)
+        self.assertTrue(location.startswith('schoolstudents/tests/integration_tests/test_query_detector.py:'))
+
+    def test_slow_queries_are_logged(self):
+        detector = QueryDetector(repeat_threshold=100, slow_ms=0)
+        with self.assertLogs('schoolstudents.query_detector', 'WARNING') as logs:
+            with detector.watch():
+                Student.objects.count()
+            detector.report('count')
+        self.assertIn('slow query', logs.output[0])
+
+    def test_strict_mode_fails_n_plus_one_requests(self):
+        with mock.patch.object(StudentModelViewSet, 'list', school_names):
+            with self.assertRaises(QueryDetectorError):
+                self.client.get(reverse('schoolstudents:students-list'))
+
+    @override_settings(QUERY_DETECTOR_STRICT=False, QUERY_DETECTOR_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_logged(self):
+        with mock.patch.object(StudentModelViewSet, 'list', school_names):
+            with self.assertLogs('schoolstudents.query_detector', 'WARNING') as logs:
+                self.client.get(reverse('schoolstudents:students-list'))
+        self.assertIn('GET /api/students/: query repeated 5 times (N+1)', logs.output[0])
@@ -0,0 +1,132 @@
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from schoolstudents.db.router import ReplicaReadMixin, ReplicaRouter, read_from_replica, replicas, use_primary
+from schoolstudents.models import School
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+@override_settings(DATABASE_REPLICAS=['replica_a', 'replica_b'], DATABASE_REPLICA_LAG_CHECK_INTERVAL=0)
+class ReplicaSelectionTestCase(TestCase):
+    def setUp(self):
+        replicas.reset()
+        self.addCleanup(replicas.reset)
+
+    def test_round_robin(self):
+        self.assertEqual([replicas.choose() for _ in range(4)], ['replica_b', 'replica_a', 'replica_b', 'replica_a'])
+
+    @override_settings(DATABASE_REPLICA_SELECTION='least_loaded')
+    def test_least_loaded(self):
+        with read_from_replica() as busy:
+            for _ in range(3):
+                self.assertNotEqual(replicas.choose(), busy)
+
+    def test_lagging_replicas_are_skipped(self):
+        replicas.mark_lagging('replica_a')
+        self.assertEqual({replicas.choose() for _ in range(4)}, {'replica_b'})
+        replicas.mark_lagging('replica_b')
+        self.assertIsNone(replicas.choose())
+        replicas.mark_lagging('replica_a', lagging=False)
+        self.assertEqual(replicas.choose(), 'replica_a')
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(School), 'default')
+        with read_from_replica() as alias:
+            self.assertEqual(router.db_for_read(School), alias)
+            self.assertEqual(router.db_for_write(School), 'default')
+            with use_primary():
+                self.assertEqual(router.db_for_read(School), 'default')
+        self.assertFalse(router.allow_migrate('replica_a', 'schoolstudents'))
+
+
+class ReplicaReadsAPITestCase(APITransactionTestCase):
+    """
+    Runs against a `replica` alias connected to the test database.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.settings['replica'] = dict(connections['default'].settings_dict)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+
+    def setUp(self):
+        replicas.reset()
+
+        override = override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_LAG_CHECK_INTERVAL=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.school = SchoolFactory(max_students=5)
+
+    def get(self, url):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            with CaptureQueriesContext(connections['default']) as primary:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return len(primary), len(replica)
+
+    def test_reads_go_to_the_replica(self):
+        primary, replica = self.get(reverse('schoolstudents:schools-detail', args=[self.school.pk]))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        replicas.mark_lagging('replica')
+        primary, replica = self.get(reverse('schoolstudents:schools-list'))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        data = {'first_name': 'Ada', 'last_name': 'Lovelace', 'age': 10, 'nationality': 'British', 'school': self.school.pk}
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.post(
+                reverse('schoolstudents:school-students-list', args=[self.school.pk]), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(len(replica), 0)
+        self.assertIn(ReplicaReadMixin.primary_pin_cookie, response.cookies)
+
+        primary, replica = self.get(reverse('schoolstudents:school-students-list', args=[self.school.pk]))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_reads_after_a_write_are_not_cached(self):
+        url = reverse('schoolstudents:school-students-list', args=[self.school.pk])
+        data = {'first_name': 'Ada', 'last_name': 'Lovelace', 'age': 10, 'nationality': 'British', 'school': self.school.pk}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        reader = self.client_class()
+        self.assertEqual([reader.get(url)['X-Cache'] for _ in range(2)], ['MISS', 'MISS'])
+        with override_settings(DATABASE_PRIMARY_PIN_SECONDS=0):
+            response = self.client.post(url, dict(data, first_name='Bob'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual([reader.get(url)['X-Cache'] for _ in range(2)], ['MISS', 'HIT'])
+
+    def test_export_streams_from_the_replica(self):
+        StudentFactory.create_batch(3, school=self.school)
+        response = self.client.get(reverse('schoolstudents:students-export'), {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connections['replica']) as replica:
+            with CaptureQueriesContext(connections['default']) as primary:
+                content = response.streaming_content
+                lines = [next(content)]
+                self.assertEqual(replicas.in_flight['replica'], 1)
+                lines += list(content)
+        response.close()
+        self.assertEqual(len(b''.join(lines).splitlines()), 4)
+        self.assertEqual(len(primary), 0)
+        self.assertGreater(len(replica), 0)
+        self.assertEqual(replicas.in_flight['replica'], 0)
@@ -0,0 +1,90 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from schoolstudents.cache import cache_stats
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheAPITestCase(APITransactionTestCase):
+    def test_school_list_is_cached(self):
+        SchoolFactory()
+        url = reverse('schoolstudents:schools-list')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        hits = cache_stats()['hit']
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(cache_stats()['hit'], hits + 1)
+
+    def test_query_params_are_part_of_the_key(self):
+        SchoolFactory()
+        url = reverse('schoolstudents:schools-list')
+        self.client.get(url)
+        response = self.client.get(url, {'ordering': 'name'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_if_none_match_returns_not_modified(self):
+        school = SchoolFactory()
+        url = reverse('schoolstudents:schools-detail', args=[school.pk])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_disabled(self):
+        SchoolFactory()
+        url = reverse('schoolstudents:schools-list')
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertNotIn('X-Cache', response)
+
+    def test_student_write_invalidates_only_its_school(self):
+        school1 = SchoolFactory(max_students=5)
+        school2 = SchoolFactory(max_students=5)
+        url1 = reverse('schoolstudents:school-students-list', kwargs={'school_pk': school1.pk})
+        url2 = reverse('schoolstudents:school-students-list', kwargs={'school_pk': school2.pk})
+        self.client.get(url1)
+        self.client.get(url2)
+
+        data = {
+            'first_name': 'John',
+            'last_name': 'Wick',
+            'age': '5.0',
+            'nationality': 'Bangladesh',
+            'school': school1.pk,
+        }
+        response = self.client.post(url1, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+
+        response = self.client.get(url1)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(self.client.get(url2)['X-Cache'], 'HIT')
+
+    def test_school_update_invalidates_school_list(self):
+        school = SchoolFactory(max_students=5)
+        url = reverse('schoolstudents:schools-list')
+        self.client.get(url)
+        response = self.client.patch(
+            reverse('schoolstudents:schools-detail', args=[school.pk]), {'name': 'renamed'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'renamed')
+
+    def test_student_delete_invalidates_school_detail(self):
+        student = StudentFactory()
+        url = reverse('schoolstudents:schools-detail', args=[student.school_id])
+        self.assertEqual(self.client.get(url).data['student_count'], 1)
+        self.client.delete(reverse('schoolstudents:students-detail', args=[student.pk]))
+        self.assertEqual(self.client.get(url).data['student_count'], 0)
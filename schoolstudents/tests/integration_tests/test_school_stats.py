@@ -0,0 +1,92 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import SchoolStatistic, Student
+from schoolstudents.services.school_statistics import count_statistics, rebuild_school_statistics
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+def stored_statistics()->set:
+    return set(
+        SchoolStatistic.objects.filter(student_count__gt=0)
+        .values_list('school_id', 'dimension', 'value', 'student_count')
+    )
+
+
+def counted_statistics()->set:
+    return {
+        (row.school_id, row.dimension, row.value, row.student_count)
+        for row in count_statistics(Student.objects.all())
+    }
+
+
+class SchoolStatsAPITestCase(APITestCase):
+    def setUp(self):
+        self.school = SchoolFactory(max_students=10)
+        StudentFactory(school=self.school, age=5, nationality='Thai')
+        StudentFactory(school=self.school, age='9.5', nationality='Thai')
+        StudentFactory(school=self.school, age=12, nationality='French')
+
+    def test_school_stats(self):
+        response = self.client.get(reverse('schoolstudents:schools-stats', args=[self.school.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data, {
+            'id': self.school.pk,
+            'name': self.school.name,
+            'max_students': 10,
+            'student_count': 3,
+            'remaining_capacity': 7,
+            'age_distribution': {'<6': 1, '6-10': 1, '10-14': 1, '14-18': 0, '18+': 0},
+            'nationalities': {'Thai': 2, 'French': 1},
+        })
+
+    def test_school_stats_list(self):
+        empty = SchoolFactory()
+        response = self.client.get(reverse('schoolstudents:schools-stats-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        results = {item['id']: item for item in response.data['results']}
+        self.assertEqual(results[self.school.pk]['nationalities'], {'Thai': 2, 'French': 1})
+        self.assertEqual(results[empty.pk]['student_count'], 0)
+        self.assertEqual(results[empty.pk]['nationalities'], {})
+
+    def test_stats_queries_do_not_depend_on_school_size(self):
+        large_school = SchoolFactory(max_students=20)
+        StudentFactory.create_batch(15, school=large_school, nationality='Thai')
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('schoolstudents:schools-stats', args=[self.school.pk]))
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('schoolstudents:schools-stats', args=[large_school.pk]))
+        self.assertEqual(response.data['student_count'], 15)
+        self.assertEqual(len(small), len(large))
+
+    def test_student_writes_keep_counters_in_step(self):
+        other = SchoolFactory(max_students=10)
+        student = Student.objects.get(school=self.school, nationality='French')
+        response = self.client.patch(
+            reverse('schoolstudents:students-detail', args=[student.pk]),
+            {'school': other.pk, 'age': '15', 'nationality': 'Malaysian'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(stored_statistics(), counted_statistics())
+
+        response = self.client.post(
+            reverse('schoolstudents:students-bulk'),
+            [{'first_name': 'A', 'last_name': 'B', 'age': 7, 'nationality': 'Thai', 'school': other.pk}],
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(stored_statistics(), counted_statistics())
+
+        self.client.delete(reverse('schoolstudents:students-detail', args=[student.pk]))
+        Student.objects.filter(nationality='Thai').delete()
+        self.assertEqual(stored_statistics(), counted_statistics())
+        self.assertEqual(stored_statistics(), set())
+
+    def test_rebuild_fixes_drift(self):
+        Student.objects.update(nationality='Lao')
+        self.assertNotEqual(stored_statistics(), counted_statistics())
+        rebuild_school_statistics()
+        self.assertEqual(stored_statistics(), counted_statistics())
@@ -0,0 +1,30 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class SearchAPITestCase(APITestCase):
+    def search(self, url_name, term):
+        response = self.client.get(reverse(f'schoolstudents:{url_name}'), {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data['results']
+
+    def test_search_students_by_name(self):
+        StudentFactory(first_name='Hulk', last_name='Hogan')
+        StudentFactory(first_name='John', last_name='Cena')
+        StudentFactory(first_name='Sam', last_name='Hulkster')
+        results = self.search('students-list', 'hulk')
+        self.assertEqual(len(results), 2)
+        results = self.search('students-list', 'hulk hog')
+        self.assertEqual([student['first_name'] for student in results], ['Hulk'])
+
+    def test_search_schools_by_name_or_max_students(self):
+        SchoolFactory(name='Green Herald', max_students=12)
+        SchoolFactory(name='Ideal School 12', max_students=5)
+        SchoolFactory(name='Scholastica', max_students=20)
+        self.assertEqual(len(self.search('schools-list', '12')), 2)
+        self.assertEqual(len(self.search('schools-list', 'herald')), 1)
+        self.assertEqual(len(self.search('schools-list', '7')), 0)
+        self.assertEqual(len(self.search('schools-list', '5')), 1)
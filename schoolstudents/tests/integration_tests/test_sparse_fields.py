@@ -0,0 +1,78 @@
+import json
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class SparseFieldsAPITestCase(APITestCase):
+    def setUp(self):
+        self.school = SchoolFactory(max_students=5)
+        self.student = StudentFactory(school=self.school)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response, [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+
+    def test_list_fields(self):
+        response, queries = self.get(reverse('schoolstudents:students-list'), fields='id,first_name')
+        self.assertEqual(response.data['results'], [{'id': self.student.pk, 'first_name': self.student.first_name}])
+        self.assertNotIn('"address"', queries[-1])
+
+        response, queries = self.get(reverse('schoolstudents:students-list'), exclude='address,student_id')
+        self.assertNotIn('address', response.data['results'][0])
+        self.assertIn('last_name', response.data['results'][0])
+        self.assertNotIn('"address"', queries[-1])
+
+    def test_detail_fields(self):
+        url = reverse('schoolstudents:schools-detail', args=[self.school.pk])
+        response, queries = self.get(url, fields='name,remaining_capacity')
+        self.assertEqual(response.data, {'name': self.school.name, 'remaining_capacity': 4})
+        self.assertNotIn('"address"', queries[-1])
+
+    def test_expand_school(self):
+        school = self.client.get(reverse('schoolstudents:schools-detail', args=[self.school.pk])).data
+        response, queries = self.get(reverse('schoolstudents:students-list'), expand='school', fields='id,school')
+        self.assertEqual(response.data['results'], [{'id': self.student.pk, 'school': school}])
+        self.assertEqual(len(queries), 2)
+        self.assertIn('JOIN', queries[-1])
+
+        url = reverse('schoolstudents:students-detail', args=[self.student.pk])
+        response, queries = self.get(url, expand='school', fields='first_name,school')
+        self.assertEqual(response.data, {'first_name': self.student.first_name, 'school': school})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"schoolstudents_student"."address"', queries[0])
+        self.assertIn('"schoolstudents_school"."address"', queries[0])
+
+    def test_unknown_fields(self):
+        response = self.client.get(reverse('schoolstudents:students-list'), {'fields': 'id,secret', 'expand': 'age'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'fields', 'expand'})
+
+    def test_writes_use_every_field(self):
+        data = {'first_name': 'John', 'last_name': 'Wick', 'age': '5.0', 'nationality': 'Thai', 'school': self.school.pk}
+        response = self.client.post(reverse('schoolstudents:students-list') + '?fields=id', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(list(response.data), ['id'])
+
+    def test_export_fields(self):
+        url = reverse('schoolstudents:students-export')
+        response = self.client.get(url, {'format': 'csv', 'fields': 'first_name,last_name', 'expand': 'school'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ['first_name,last_name', f'{self.student.first_name},{self.student.last_name}'])
+
+    @override_settings(ROOT_URLCONF='manatal_challenge.asgi_urls')
+    async def test_async_routes(self):
+        url = reverse('schoolstudents:students-list')
+        params = {'fields': 'id,school', 'expand': 'school'}
+        response = await self.async_client.get(url, params)
+        with override_settings(ROOT_URLCONF='manatal_challenge.urls'):
+            expected = await self.async_client.get(url, params)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
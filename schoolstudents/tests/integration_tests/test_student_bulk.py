@@ -0,0 +1,97 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import School, Student
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+def student_data(**kwargs):
+    data = {
+        'first_name': 'John',
+        'last_name': 'Wick',
+        'age': '5.0',
+        'nationality': 'Bangladesh',
+    }
+    data.update(kwargs)
+    return data
+
+
+class StudentBulkAPITestCase(APITestCase):
+    def test_bulk_create_students(self):
+        school1 = SchoolFactory(max_students=5)
+        school2 = SchoolFactory(max_students=5)
+        data = [
+            student_data(school=school1.pk),
+            student_data(school=school1.pk),
+            student_data(school=school2.pk),
+        ]
+        url = reverse('schoolstudents:students-bulk')
+        response = self.client.post(url, data, format='json')
+        school1.refresh_from_db()
+        school2.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(len(response.data['created']), 3)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Student.objects.count(), 3)
+        self.assertEqual(school1.student_count, 2)
+        self.assertEqual(school2.student_count, 1)
+
+    def test_bulk_create_in_school_defaults_school(self):
+        school = SchoolFactory(max_students=5)
+        url = reverse('schoolstudents:school-students-bulk', kwargs={'school_pk': school.pk})
+        response = self.client.post(url, [student_data(), student_data()], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(school.students.count(), 2)
+
+    def test_bulk_create_all_or_nothing_rejects_everything(self):
+        school = SchoolFactory(max_students=5)
+        data = [
+            student_data(school=school.pk),
+            student_data(school=school.pk, first_name=''),
+        ]
+        url = reverse('schoolstudents:students-bulk')
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('first_name', response.data['errors'][0]['errors'])
+        self.assertEqual(Student.objects.count(), 0)
+
+    def test_bulk_create_all_or_nothing_over_capacity(self):
+        school = SchoolFactory(max_students=2)
+        StudentFactory(school=school)
+        data = [student_data(school=school.pk), student_data(school=school.pk)]
+        url = reverse('schoolstudents:students-bulk')
+        response = self.client.post(url, data, format='json')
+        school.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        self.assertEqual(Student.objects.count(), 1)
+        self.assertEqual(school.student_count, 1)
+
+    def test_bulk_create_partial_accepts_valid_rows(self):
+        school = SchoolFactory(max_students=2)
+        data = [
+            student_data(school=school.pk),
+            student_data(school=school.pk, first_name=''),
+            student_data(school=school.pk),
+            student_data(school=school.pk),
+        ]
+        url = reverse('schoolstudents:students-bulk') + '?mode=partial'
+        response = self.client.post(url, data, format='json')
+        school.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 3])
+        self.assertEqual(
+            response.data['errors'][1]['errors'],
+            {'school': [f'Maximum students limit exceeded for {school}.']}
+        )
+        self.assertEqual(school.student_count, 2)
+
+    def test_bulk_create_in_school_rejects_other_school(self):
+        school = SchoolFactory(max_students=5)
+        other_school = SchoolFactory(max_students=5)
+        url = reverse('schoolstudents:school-students-bulk', kwargs={'school_pk': school.pk})
+        response = self.client.post(url, [student_data(school=other_school.pk)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        self.assertEqual(School.objects.get(pk=other_school.pk).student_count, 0)
@@ -0,0 +1,136 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from factory import fuzzy
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import School, Student
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+from schoolstudents.tests.integration_tests.test_school_stats import counted_statistics, stored_statistics
+
+
+class StudentCountAPITestCase(APITestCase):
+    def test_create_student_increments_count(self):
+        school = SchoolFactory(max_students=5)
+        data = {
+            'first_name': 'John',
+            'last_name': 'Cena',
+            'age': '5.0',
+            'school': school.id,
+            'nationality': fuzzy.FuzzyText(length=10),
+        }
+        response = self.client.post(reverse('schoolstudents:students-list'), data)
+        school.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(school.student_count, 1)
+
+    def test_move_student_updates_both_schools(self):
+        school = SchoolFactory(max_students=5)
+        new_school = SchoolFactory(max_students=5)
+        student = StudentFactory(school=school)
+        url = reverse('schoolstudents:students-detail', args=[student.pk])
+        response = self.client.patch(url, {'school': new_school.pk})
+        school.refresh_from_db()
+        new_school.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(school.student_count, 0)
+        self.assertEqual(new_school.student_count, 1)
+
+    def test_update_student_in_full_school_keeps_seat(self):
+        school = SchoolFactory(max_students=1)
+        student = StudentFactory(school=school)
+        url = reverse('schoolstudents:students-detail', args=[student.pk])
+        response = self.client.patch(url, {'school': school.pk, 'last_name': 'Wick'})
+        school.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(school.student_count, 1)
+
+    def test_failed_create_does_not_take_seat(self):
+        school = SchoolFactory(max_students=1)
+        StudentFactory(school=school)
+        data = {
+            'first_name': 'John',
+            'last_name': 'Wick',
+            'age': '5.0',
+            'school': school.id,
+            'nationality': fuzzy.FuzzyText(length=10),
+        }
+        response = self.client.post(reverse('schoolstudents:students-list'), data)
+        school.refresh_from_db()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        self.assertEqual(school.student_count, 1)
+
+    def test_delete_student_decrements_count(self):
+        student = StudentFactory()
+        url = reverse('schoolstudents:students-detail', args=[student.pk])
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT, response.data)
+        self.assertEqual(School.objects.get(pk=student.school_id).student_count, 0)
+
+    def test_bulk_delete_releases_seats_per_school(self):
+        school1 = SchoolFactory(max_students=5)
+        school2 = SchoolFactory(max_students=5)
+        StudentFactory.create_batch(3, school=school1)
+        StudentFactory.create_batch(2, school=school2)
+        Student.objects.filter(school__in=[school1, school2]).delete()
+        school1.refresh_from_db()
+        school2.refresh_from_db()
+        self.assertEqual(school1.student_count, 0)
+        self.assertEqual(school2.student_count, 0)
+
+    def test_school_save_keeps_concurrent_seats(self):
+        school = SchoolFactory(max_students=5)
+        stale = School.objects.get(pk=school.pk)
+        School.objects.admit_student(school.pk)
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(stale.student_count, 1)
+        self.assertEqual(School.objects.get(pk=school.pk).student_count, 1)
+
+        response = self.client.patch(
+            reverse('schoolstudents:schools-detail', args=[school.pk]), {'name': 'x', 'student_count': 3}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['student_count'], 1)
+        self.assertEqual(School.objects.get(pk=school.pk).student_count, 1)
+
+    def assertCounts(self, *schools):
+        for school in schools:
+            school = School.objects.get(pk=school.pk)
+            self.assertEqual(school.student_count, school.students.count(), school)
+        self.assertEqual(stored_statistics(), counted_statistics())
+
+    def test_stale_instances_move_the_stored_student(self):
+        school_a, school_b, school_c = SchoolFactory.create_batch(3, max_students=5)
+        student = StudentFactory(school=school_a)
+        first, second = Student.objects.get(pk=student.pk), Student.objects.get(pk=student.pk)
+        first.school = school_b
+        first.save()
+        second.school = school_c
+        second.age = 12
+        second.save()
+        self.assertEqual(second.previous_school_id, school_b.pk)
+        self.assertCounts(school_a, school_b, school_c)
+
+    def test_stale_instances_delete_once(self):
+        school = SchoolFactory(max_students=5)
+        student, other = StudentFactory.create_batch(2, school=school)
+        first, second = Student.objects.get(pk=student.pk), Student.objects.get(pk=student.pk)
+        first.delete()
+        self.assertEqual(second.delete()[0], 0)
+        self.assertCounts(school)
+        self.assertEqual(Student.objects.filter(pk=student.pk).delete()[0], 0)
+        self.assertCounts(school)
+
+    def test_reconcile_command_fixes_drift(self):
+        school = SchoolFactory(max_students=5)
+        StudentFactory.create_batch(2, school=school)
+        School.objects.filter(pk=school.pk).update(student_count=4)
+
+        out = StringIO()
+        call_command('reconcile_student_counts', stdout=out)
+        school.refresh_from_db()
+        self.assertEqual(school.student_count, 2)
+        self.assertIn('1 school(s) out of sync.', out.getvalue())
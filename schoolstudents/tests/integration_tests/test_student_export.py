@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.serializers import StudentSerializer
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+class StudentExportAPITestCase(APITestCase):
+    def export(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        school = SchoolFactory(max_students=5)
+        students = StudentFactory.create_batch(3, school=school)
+        response, content = self.export(reverse('schoolstudents:students-export'), format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('students.csv', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 3)
+        expected = StudentSerializer(students[0]).data
+        row = next(row for row in rows if row['id'] == str(students[0].pk))
+        self.assertEqual(row, {name: str(value) for name, value in expected.items()})
+
+    def test_export_ndjson_in_school_with_filters(self):
+        school = SchoolFactory(max_students=5)
+        StudentFactory(school=school, first_name='Bob', last_name='Smith')
+        StudentFactory(school=school, first_name='Alice', last_name='Smith')
+        StudentFactory(school=school, first_name='Carl', last_name='Smith')
+        StudentFactory(first_name='Alfred', last_name='Smith')
+        url = reverse('schoolstudents:school-students-export', kwargs={'school_pk': school.pk})
+        response, content = self.export(url, format='ndjson', ordering='-first_name', search='l')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['first_name'] for row in rows], ['Carl', 'Alice'])
+
+    def test_export_defaults_to_csv(self):
+        StudentFactory()
+        response, content = self.export(reverse('schoolstudents:students-export'))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(len(content.splitlines()), 2)
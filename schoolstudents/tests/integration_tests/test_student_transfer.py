@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import Change, School, Student
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+from schoolstudents.tests.integration_tests.test_school_stats import counted_statistics, stored_statistics
+
+
+class StudentTransferAPITestCase(APITestCase):
+    def setUp(self):
+        self.source = SchoolFactory(max_students=20)
+        self.destination = SchoolFactory(max_students=3)
+        self.students = StudentFactory.create_batch(4, school=self.source)
+        self.url = reverse('schoolstudents:school-students-transfer', args=[self.source.pk])
+
+    def transfer(self, students, url=None, partial=False):
+        data = {'students': [student.pk for student in students], 'school': self.destination.pk}
+        url = (url or self.url) + ('?mode=partial' if partial else '')
+        return self.client.post(url, data, format='json')
+
+    def assertSchool(self, school, student_count):
+        school = School.objects.get(pk=school.pk)
+        self.assertEqual((school.student_count, school.students.count()), (student_count, student_count))
+
+    def test_transfer(self):
+        response = self.transfer(self.students[:2])
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data, {'transferred': 2, 'rejected': {'not_found': [], 'over_capacity': []}})
+        self.assertSchool(self.source, 2)
+        self.assertSchool(self.destination, 2)
+        self.assertEqual(stored_statistics(), counted_statistics())
+        self.assertEqual(set(Student.objects.filter(version=2).values_list('pk', flat=True)),
+                         {student.pk for student in self.students[:2]})
+        self.assertEqual(Change.objects.filter(model='student', action=Change.UPDATE).count(), 2)
+
+    def test_queries_do_not_depend_on_the_students(self):
+        with CaptureQueriesContext(connection) as one:
+            self.transfer(self.students[:1])
+        self.destination.max_students = 20
+        self.destination.save()
+        with CaptureQueriesContext(connection) as three:
+            response = self.transfer(self.students[1:])
+        self.assertEqual(response.data['transferred'], 3)
+        self.assertEqual(len(one), len(three))
+        self.assertEqual(sum(query['sql'].startswith('UPDATE "schoolstudents_student"') for query in three), 1)
+
+    def test_rejected_students(self):
+        other = StudentFactory(school=SchoolFactory(max_students=1))
+        response = self.transfer([self.students[0], other])
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data, {'transferred': 1, 'rejected': {'not_found': [other.pk], 'over_capacity': []}})
+        self.assertEqual(Student.objects.get(pk=other.pk).school_id, other.school_id)
+
+    def test_over_capacity(self):
+        response = self.transfer(self.students)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        self.assertEqual(response.data['rejected']['over_capacity'], [student.pk for student in self.students])
+        self.assertSchool(self.destination, 0)
+
+        response = self.transfer(self.students, partial=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data, {
+            'transferred': 3, 'rejected': {'not_found': [], 'over_capacity': [self.students[3].pk]},
+        })
+        self.assertSchool(self.destination, 3)
+        self.assertSchool(self.source, 1)
+
+    def test_freed_seats_go_to_the_waitlist(self):
+        full = SchoolFactory(max_students=1)
+        student = StudentFactory(school=full)
+        self.client.post(reverse('schoolstudents:school-waitlist-list', args=[full.pk]), {
+            'first_name': 'Ann', 'last_name': 'Doe', 'age': '7.5', 'nationality': 'Thai',
+        })
+        url = reverse('schoolstudents:school-students-transfer', args=[full.pk])
+        response = self.transfer([student], url=url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(list(full.students.values_list('first_name', flat=True)), ['Ann'])
+
+    def test_invalid_requests(self):
+        response = self.client.post(self.url, {'students': [], 'school': self.destination.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        response = self.client.post(self.url, {'students': [1], 'school': self.source.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        response = self.client.post(self.url, {'students': [1], 'school': self.destination.pk + 100}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, response.data)
+        response = self.transfer(self.students[:1], url=reverse('schoolstudents:students-transfer'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.data)
+        url = reverse('schoolstudents:school-students-transfer', args=[self.destination.pk + 100])
+        response = self.transfer(self.students[:1], url=url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, response.data)
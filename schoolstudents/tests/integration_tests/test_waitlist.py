@@ -0,0 +1,91 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from schoolstudents.models import SchoolStatistic, Student, WaitlistEntry
+from schoolstudents.tests.factories import SchoolFactory, StudentFactory
+
+
+def entry_data(first_name, **kwargs):
+    data = {'first_name': first_name, 'last_name': 'Doe', 'age': '7.5', 'nationality': 'Thai'}
+    data.update(kwargs)
+    return data
+
+
+class WaitlistAPITestCase(APITestCase):
+    def setUp(self):
+        self.school = SchoolFactory(max_students=2)
+        self.students = StudentFactory.create_batch(2, school=self.school)
+        self.url = reverse('schoolstudents:school-waitlist-list', args=[self.school.pk])
+
+    def join(self, first_name, **kwargs):
+        response = self.client.post(self.url, entry_data(first_name, **kwargs))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data
+
+    def test_join_full_school_waits_in_order(self):
+        self.assertEqual((self.join('Ann')['status'], self.join('Bob')['position']), ('waiting', 2))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(
+            [(entry['first_name'], entry['position']) for entry in response.data['results']],
+            [('Ann', 1), ('Bob', 2)],
+        )
+
+    def test_join_school_with_free_seat_enrolls(self):
+        school = SchoolFactory(max_students=1)
+        url = reverse('schoolstudents:school-waitlist-list', args=[school.pk])
+        response = self.client.post(url, entry_data('Ann'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual((response.data['status'], response.data['position']), ('enrolled', None))
+        self.assertEqual(Student.objects.get(pk=response.data['student']).school_id, school.pk)
+
+    def test_deleted_student_seat_goes_to_first_waiting(self):
+        ann, bob = self.join('Ann'), self.join('Bob')
+        response = self.client.delete(reverse('schoolstudents:students-detail', args=[self.students[0].pk]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        ann_entry, bob_entry = WaitlistEntry.objects.get(pk=ann['id']), WaitlistEntry.objects.get(pk=bob['id'])
+        self.assertEqual((ann_entry.status, bob_entry.status), ('enrolled', 'waiting'))
+        self.assertEqual(ann_entry.student.first_name, 'Ann')
+        self.school.refresh_from_db()
+        self.assertEqual(self.school.student_count, 2)
+        self.assertTrue(SchoolStatistic.objects.filter(
+            school=self.school, dimension=SchoolStatistic.NATIONALITY, value='Thai', student_count=1).exists())
+
+        detail = self.client.get(reverse('schoolstudents:school-waitlist-detail', args=[self.school.pk, bob['id']]))
+        self.assertEqual(detail.data['position'], 1)
+
+    def test_moved_student_frees_seat(self):
+        self.join('Ann')
+        other = SchoolFactory(max_students=5)
+        response = self.client.patch(
+            reverse('schoolstudents:students-detail', args=[self.students[0].pk]), {'school': other.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertFalse(WaitlistEntry.objects.waiting().exists())
+
+    def test_raising_max_students_promotes_a_batch(self):
+        for name in ('Ann', 'Bob', 'Cid'):
+            self.join(name)
+        response = self.client.patch(
+            reverse('schoolstudents:schools-detail', args=[self.school.pk]), {'max_students': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['student_count'], 4)
+        self.assertEqual(list(WaitlistEntry.objects.waiting().values_list('first_name', flat=True)), ['Cid'])
+
+    def test_leave_waitlist(self):
+        ann = self.join('Ann')
+        url = reverse('schoolstudents:school-waitlist-detail', args=[self.school.pk, ann['id']])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_enrolled_entry_cannot_leave(self):
+        ann = self.join('Ann')
+        self.client.delete(reverse('schoolstudents:students-detail', args=[self.students[0].pk]))
+        url = reverse('schoolstudents:school-waitlist-detail', args=[self.school.pk, ann['id']])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_join_unknown_school(self):
+        url = reverse('schoolstudents:school-waitlist-list', args=[0])
+        self.assertEqual(self.client.post(url, entry_data('Ann')).status_code, status.HTTP_404_NOT_FOUND)
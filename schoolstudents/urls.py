@@ -7,11 +7,15 @@ from schoolstudents import views
 router = routers.DefaultRouter()
 router.register(r'schools', views.SchoolModelViewSet, basename='schools')
 router.register(r'students', views.StudentModelViewSet, basename='students')
+router.register(r'search', views.SearchViewSet, basename='search')
+router.register(r'changes', views.ChangeFeedViewSet, basename='changes')
 
 nested_router = routers.NestedSimpleRouter(router, r'schools', lookup='school')
 nested_router.register(r'students', views.StudentModelViewSet, basename='school-students')
+nested_router.register(r'waitlist', views.WaitlistViewSet, basename='school-waitlist')
 
 urlpatterns = [
+    path('_metrics/', views.metrics_view, name='metrics'),
     path('', include(router.urls)),
     path('', include(nested_router.urls))
 ]
\ No newline at end of file
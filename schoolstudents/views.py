@@ -1,14 +1,51 @@
-from django.db import transaction
-from rest_framework import filters, viewsets
+import hmac
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection, transaction
+from django.db.models import F, IntegerField, Value, Window
+from django.db.models.functions import Greatest, RowNumber
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 
-from schoolstudents.models import School, Student
-from schoolstudents.serializers import SchoolSerializer, StudentSerializer
+from schoolstudents import metrics
+from schoolstudents.cache import ResponseCacheMixin, bump_versions
+from schoolstudents.conditional import ConditionalUpdateMixin
+from schoolstudents.db.locks import bounded_lock_wait
+from schoolstudents.db.router import ReplicaReadMixin
+from schoolstudents.fast_serializers import ValuesListMixin, ValuesRowSerializer
+from schoolstudents.filters import FullTextSearchFilter, IndexedSearchFilter
+from schoolstudents.idempotency import IdempotencyMixin, idempotent
+from schoolstudents.models import School, Student, WaitlistEntry
+from schoolstudents.pagination import CursorPaginationMixin
+from schoolstudents.query_detector import polling
+from schoolstudents.renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from schoolstudents.serializers import (
+    SchoolSerializer, StudentSerializer, StudentTransferSerializer, WaitlistEntrySerializer,
+)
+from schoolstudents.services.change_feed import parse_feed_params, read_changes
+from schoolstudents.services.school_statistics import school_statistics
 from schoolstudents.services.school_validation import before_save_trigger_school
-from schoolstudents.services.student_validation import before_save_trigger_student
+from schoolstudents.services.student_enrollment import bulk_enroll_students
+from schoolstudents.services.student_transfer import transfer_students
+from schoolstudents.services.waitlist import promote_waitlist
+from schoolstudents.sparse_fields import SparseFieldsMixin
+
 
+def remaining_capacity(prefix='')->Greatest:
+    return Greatest(
+        F(f'{prefix}max_students') - F(f'{prefix}student_count'), Value(0), output_field=IntegerField()
+    )
 
-class SchoolModelViewSet(viewsets.ModelViewSet):
+
+class SchoolModelViewSet(ReplicaReadMixin, ResponseCacheMixin, ConditionalUpdateMixin, SparseFieldsMixin, ValuesListMixin,
+                         CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ## School Management
     -----------------------
@@ -18,6 +55,17 @@ class SchoolModelViewSet(viewsets.ModelViewSet):
     - Search
         1. Method: **GET**
         2. URL: api/schools/?serach=school
+    - Cursor pagination
+        1. Method: **GET**
+        2. URL: api/schools/?pagination=cursor&ordering=name
+        3. Follow `next`/`previous` links. The total `count` is skipped
+           unless `count=true` is passed.
+    - Sparse fields
+        1. Method: **GET**
+        2. URL:
+            - api/schools/?fields=id,name,remaining_capacity
+            - api/schools/{pk}/?exclude=address
+        3. Only the columns of the selected fields are read.
     - Create School 
         1. Method: **POST**
         2. URL: api/schools/
@@ -58,26 +106,92 @@ class SchoolModelViewSet(viewsets.ModelViewSet):
         3. `pk`
             - type: interger
             - description: It should be school id.
+    - Conditional update
+        1. Send the `ETag` of the school detail, its `version`, as
+           `If-Match` with **PUT** or **PATCH**; `412` if the school was
+           written since, student enrollments included.
+        2. Patching only `name`, `city`, `country` or `address` is a single
+           conditional UPDATE.
+    - School statistics
+        1. Method: **GET**
+        2. URL:
+            - api/schools/{pk}/stats/
+            - api/schools/stats/
+        3. Enrollment count, remaining capacity, students per age group
+           and per nationality, read from counters kept up to date by
+           every student write. The list is paginated like the school list.
     """
     serializer_class = SchoolSerializer
-    filter_backends = (filters.OrderingFilter, filters.SearchFilter,)
+    values_serializer = ValuesRowSerializer(SchoolSerializer, annotations={'remaining_capacity': remaining_capacity()})
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer, )
+    filter_backends = (filters.OrderingFilter, IndexedSearchFilter,)
     search_fields = ('name', 'max_students')
     ordering_fields = ('name', 'city', 'country', )
-    queryset = School.objects.all()
+    queryset = School.objects.defer('search_vector')
+    loaded_fields = ('pk', 'version', )
+    plain_update_fields = ('name', 'city', 'country', 'address', )
+
+    def get_cache_scopes(self):
+        if self.detail:
+            return [f'school:{self.kwargs["pk"]}']
+        return ['schools']
+
+    def perform_create(self, serializer):
+        serializer.save()
+        bump_versions('schools')
+
+    def perform_update(self, serializer):
+        """
+        Raising `max_students` enrolls students from the waitlist.
+        """
+        previous_max_students = serializer.instance.max_students
+        serializer.save()
+        # Student lists inline the school with `expand=school`.
+        bump_versions('schools', 'students', f'school:{serializer.instance.pk}')
+        if serializer.instance.max_students > previous_max_students and promote_waitlist([serializer.instance.pk]):
+            serializer.instance.refresh_from_db(fields=['student_count', 'version'])
+
+    def perform_conditional_update(self, instance):
+        bump_versions('schools', 'students', f'school:{instance.pk}')
 
-    def update(self, request, *args, **kwargs):
+    def perform_destroy(self, instance):
+        school_pk = instance.pk
+        instance.delete()
+        bump_versions('schools', 'students', f'school:{school_pk}')
+
+    def locked_update(self, request, *args, **kwargs):
         """
-        Check maximum students limit and then save.
+        Check maximum students limit and then save, holding the school row
+        so that no student is enrolled in between.
         """
         max_students = request.data.get('max_students', None)
-        school_obj = self.get_object()
-        if max_students and not before_save_trigger_school(school_obj, int(max_students)):
-            raise ValidationError(f'Maximum students limit exceeded for {school_obj}.')
         with transaction.atomic():
-            return super().update(request, *args, **kwargs)
+            school_obj = self.get_object()
+            if max_students and not before_save_trigger_school(school_obj, int(max_students)):
+                raise ValidationError(f'Maximum students limit exceeded for {school_obj}.')
+            return super().locked_update(request, *args, **kwargs)
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, *args, **kwargs):
+        def view(request, *args, **kwargs):
+            return Response(school_statistics([self.get_object()])[0])
+        return self.cached_response(view, request, *args, **kwargs)
 
+    @action(detail=False, methods=['get'], url_path='stats', url_name='stats-list')
+    def stats_list(self, request, *args, **kwargs):
+        def view(request, *args, **kwargs):
+            queryset = self.filter_queryset(self.get_queryset())
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(school_statistics(page))
+            return Response(school_statistics(queryset))
+        return self.cached_response(view, request, *args, **kwargs)
 
-class StudentModelViewSet(viewsets.ModelViewSet):
+
+class StudentModelViewSet(ReplicaReadMixin, IdempotencyMixin, ResponseCacheMixin, ConditionalUpdateMixin, SparseFieldsMixin,
+                          ValuesListMixin, CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ## Student Management
     -----------------------
@@ -91,6 +205,21 @@ class StudentModelViewSet(viewsets.ModelViewSet):
         2. URL: 
             - api/students/?serach=ahsan
             - api/schools/{school_pk}/students/?serach=ahsan
+    - Cursor pagination
+        1. Method: **GET**
+        2. URL: 
+            - api/students/?pagination=cursor&ordering=last_name
+            - api/schools/{school_pk}/students/?pagination=cursor
+        3. Follow `next`/`previous` links. The total `count` is skipped
+           unless `count=true` is passed.
+    - Sparse fields
+        1. Method: **GET**
+        2. URL:
+            - api/students/?fields=id,first_name,last_name
+            - api/students/{pk}/?exclude=address
+            - api/students/?expand=school
+        3. Only the columns of the selected fields are read. `expand=school`
+           inlines the school of each student, read with the same query.
     - Create Student 
         1. Method: **POST**
         2. URL: 
@@ -119,6 +248,56 @@ class StudentModelViewSet(viewsets.ModelViewSet):
                 - type: integer
                 - **required: true**
                 - desc: School type object
+    - Bulk enrollment
+        1. Method: **POST**
+        2. URL: 
+            - api/students/bulk/
+            - api/schools/{school_pk}/students/bulk/
+        3. Request body: list of students with the same parameters as
+           **Create Student**. `school` defaults to `school_pk` on the nested URL.
+        4. Query Parameters
+            - name: mode
+                - type: string
+                - desc: `all_or_nothing` (default) rejects the whole list if
+                  any row is invalid or over capacity, `partial` creates the
+                  valid rows and reports the rest.
+        5. Response: `created` students and per-row `errors` as
+           `{"index": ..., "errors": ...}`.
+    - Transfer
+        1. Method: **POST**
+        2. URL: api/schools/{school_pk}/students/transfer/
+        3. Request Parameters
+            - name: students
+                - type: list of integers
+                - **required: true**
+                - desc: Ids of students of school `school_pk`.
+            - name: school
+                - type: integer
+                - **required: true**
+                - desc: Destination school.
+        4. Query Parameters
+            - name: mode
+                - type: string
+                - desc: `all_or_nothing` (default) moves nobody if the
+                  destination lacks seats for every student, `partial`
+                  moves as many as fit, in request order.
+        5. Response: the number of students `transferred` and the
+           `rejected` ids, `not_found` in the school or `over_capacity`.
+           Students are moved with a single UPDATE and the freed seats go
+           to the waitlist of the school.
+    - Idempotent retries
+        1. Send an `Idempotency-Key` header (up to 255 characters, e.g. a
+           UUID) with **Create Student**, **Bulk enrollment** or **Transfer**.
+        2. A retry with the same key gets the first response back, marked
+           `Idempotent-Replayed: true`, without creating anything. Reusing
+           a key for another request is answered with `422`.
+    - Export
+        1. Method: **GET**
+        2. URL: 
+            - api/students/export/?format=csv
+            - api/schools/{school_pk}/students/export/?format=ndjson
+        3. Streams every matching student as `csv` (default) or `ndjson`.
+           `search` and `ordering` work as on the list API.
     - Student detail
         1. Method: **GET**
         2. URL: 
@@ -143,22 +322,36 @@ class StudentModelViewSet(viewsets.ModelViewSet):
         3. `pk`
             - type: interger
             - description: It should be student id.
+    - Conditional update
+        1. Send the `ETag` of the student detail, its `version`, as
+           `If-Match` with **PUT** or **PATCH**; `412` if the student was
+           written since.
+        2. Patching only `first_name`, `last_name` or `address` is a single
+           conditional UPDATE.
     """
     serializer_class = StudentSerializer
-    filter_backends = (filters.OrderingFilter, filters.SearchFilter,)
+    values_serializer = ValuesRowSerializer(StudentSerializer, expandable={
+        'school': ValuesRowSerializer(
+            SchoolSerializer, annotations={'remaining_capacity': remaining_capacity('school__')}, prefix='school__',
+        ),
+    })
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer, )
+    filter_backends = (filters.OrderingFilter, IndexedSearchFilter,)
     search_fields = ('first_name', 'last_name', )
     ordering_fields = (
         'first_name', 'last_name',
         'age', 'nationality', 
         'school__name', 'school__city', 'school_country', 
         )
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related('school').defer('search_vector', 'school__search_vector')
+    loaded_fields = ('pk', 'version', )
+    plain_update_fields = ('first_name', 'last_name', 'address', )
 
     def get_queryset(self):
         """
         Filter queryset if school_pk exists, otherwise return all
         """
-        queryset = self.queryset
+        queryset = super().get_queryset()
         school_pk = self.kwargs.get('school_pk', None)
 
         if school_pk:
@@ -166,25 +359,350 @@ class StudentModelViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_cache_scopes(self):
+        school_pk = self.kwargs.get('school_pk', None)
+        if school_pk:
+            return [f'school:{school_pk}']
+        return ['students']
+
+    def bump_cache_versions(self, *school_pks):
+        """
+        Student writes change the student lists and the counters shown by
+        the school lists of every school involved.
+        """
+        bump_versions('schools', 'students', *(f'school:{pk}' for pk in school_pks))
+
     def perform_create(self, serializer):
         """
         Prevent concurrent save and maximum students limit in school.
+        The seat is taken by `before_save_trigger_student` on save.
         """
         with transaction.atomic():
-            school = serializer.validated_data.get('school', None)
-            if school and not before_save_trigger_student(school):
-                raise ValidationError(f'Maximum students limit exceeded for {school}.')
-                
-            serializer.save()
+            try:
+                serializer.save()
+            except DjangoValidationError as ex:
+                raise ValidationError(ex.messages)
+            self.bump_cache_versions(serializer.instance.school_id)
 
     def perform_update(self, serializer):
         """
         Prevent concurrent save and maximum students limit in school.
+        The seat is taken by `before_save_trigger_student` on save, and the
+        seat freed by a move goes to the waitlist of the previous school.
         """
         with transaction.atomic():
-            school = serializer.validated_data.get('school', None)
-            if school and not before_save_trigger_student(school):
-                raise ValidationError(f'Maximum students limit exceeded for {school}.')
-                
-            serializer.save()
+            try:
+                serializer.save()
+            except DjangoValidationError as ex:
+                raise ValidationError(ex.messages)
+            previous_school_pk = serializer.instance.previous_school_id
+            self.bump_cache_versions(previous_school_pk, serializer.instance.school_id)
+            if previous_school_pk not in (None, serializer.instance.school_id):
+                promote_waitlist([previous_school_pk])
+
+    def perform_conditional_update(self, instance):
+        self.bump_cache_versions(instance.school_id)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic(), bounded_lock_wait():
+            instance.delete()
+            if instance.previous_school_id is not None:
+                self.bump_cache_versions(instance.previous_school_id)
+                promote_waitlist([instance.previous_school_id])
+
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def bulk(self, request, *args, **kwargs):
+        """
+        Enroll a list of students, checking every school's capacity once.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError('Expected a list of students.')
+        all_or_nothing = request.query_params.get('mode', 'all_or_nothing') != 'partial'
+        school_pk = self.kwargs.get('school_pk', None)
+        if school_pk:
+            rows = [
+                dict(row, school=row.get('school', school_pk)) if isinstance(row, dict) else row
+                for row in rows
+            ]
+
+        with transaction.atomic():
+            with bounded_lock_wait():
+                schools = School.objects.select_for_update().order_by('pk').in_bulk(self._school_pks(rows))
+            context = self.get_serializer_context()
+            context['schools'] = schools
+            serializer = self.get_serializer(data=rows, many=True, context=context)
+            serializer.is_valid()
+
+            errors = dict(serializer.row_errors)
+            valid_rows = []
+            for index, data in serializer.valid_rows:
+                if school_pk and str(data['school'].pk) != str(school_pk):
+                    errors[index] = {'school': [f'Student must belong to school {school_pk}.']}
+                else:
+                    valid_rows.append((index, data))
+            if errors and all_or_nothing:
+                return Response({'errors': self._row_errors(errors)}, status=status.HTTP_400_BAD_REQUEST)
+
+            created, rejected = bulk_enroll_students(
+                valid_rows, schools, all_or_nothing=all_or_nothing
+            )
+            valid_data = dict(valid_rows)
+            for index in rejected:
+                school = valid_data[index]['school']
+                errors[index] = {'school': [f'Maximum students limit exceeded for {school}.']}
+            if not created:
+                return Response({'errors': self._row_errors(errors)}, status=status.HTTP_400_BAD_REQUEST)
+            self.bump_cache_versions(*{student.school_id for student in created})
+
+        return Response({
+            'created': self.get_serializer(created, many=True).data,
+            'errors': self._row_errors(errors),
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    @idempotent
+    def transfer(self, request, *args, **kwargs):
+        """
+        Move students of the school to another one, checking its capacity once.
+        """
+        try:
+            source_pk = int(self.kwargs.get('school_pk', None))
+        except (TypeError, ValueError):
+            raise Http404('Transfer students from api/schools/{school_pk}/students/transfer/.')
+        serializer = StudentTransferSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        destination = serializer.validated_data['school']
+        if destination.pk == source_pk:
+            raise ValidationError({'school': [f'Students already belong to school {source_pk}.']})
+        all_or_nothing = request.query_params.get('mode', 'all_or_nothing') != 'partial'
+
+        with transaction.atomic():
+            transferred, not_found, over_capacity = transfer_students(
+                source_pk, destination.pk, serializer.validated_data['students'], all_or_nothing=all_or_nothing
+            )
+            if transferred:
+                self.bump_cache_versions(source_pk, destination.pk)
+                promote_waitlist([source_pk])
 
+        return Response({
+            'transferred': len(transferred),
+            'rejected': {'not_found': not_found, 'over_capacity': over_capacity},
+        }, status=status.HTTP_200_OK if transferred else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'], renderer_classes=(CSVRenderer, NDJSONRenderer, ))
+    def export(self, request, *args, **kwargs):
+        """
+        Stream the filtered students with a server-side cursor.
+        """
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        queryset = self.filter_queryset(self.get_queryset())
+        # Nested schools do not fit in a CSV row, `expand` is ignored.
+        values_serializer = self.values_serializer.select(self.get_field_selection()[0])
+        rows = values_serializer.values(queryset).iterator(chunk_size=chunk_size)
+        items = values_serializer.iter_representation(rows, chunk_size)
+        header = values_serializer.field_names
+
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.stream(header, items, chunk_size=chunk_size), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="students.{renderer.format}"'
+        return response
+
+    @staticmethod
+    def _school_pks(rows):
+        pks = set()
+        for row in rows:
+            try:
+                pks.add(int(row['school']))
+            except (KeyError, TypeError, ValueError):
+                pass
+        return pks
+
+    @staticmethod
+    def _row_errors(errors):
+        return [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+
+
+class WaitlistViewSet(ReplicaReadMixin, mixins.CreateModelMixin, mixins.ListModelMixin,
+                      mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    ## School Waitlist
+    -----------------------
+    - Join
+        1. Method: **POST**
+        2. URL: api/schools/{school_pk}/waitlist/
+        3. Request Parameters: `first_name`, `last_name`, `age`,
+           `nationality` and `address` as on **Create Student**.
+        4. The student is enrolled right away when the school has a free
+           seat and nobody is waiting; otherwise the entry waits with its
+           `position` in the queue.
+    - Queue
+        1. Method: **GET**
+        2. URL: api/schools/{school_pk}/waitlist/
+        3. The waiting entries, first come first served.
+    - Entry status
+        1. Method: **GET**
+        2. URL: api/schools/{school_pk}/waitlist/{pk}/
+        3. `status` is `waiting` or `enrolled`, with the created `student`.
+    - Leave
+        1. Method: **DELETE**
+        2. URL: api/schools/{school_pk}/waitlist/{pk}/
+
+    Waiting students are enrolled in order when a student of the school is
+    deleted or moved, or when its `max_students` is raised.
+    """
+    serializer_class = WaitlistEntrySerializer
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer, )
+    queryset = WaitlistEntry.objects.all()
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(school=self.kwargs['school_pk'])
+        if self.action == 'list':
+            queryset = queryset.waiting().annotate(
+                position=Window(RowNumber(), order_by=F('pk').asc())
+            ).order_by('pk')
+        return queryset
+
+    def get_object(self):
+        entry = super().get_object()
+        entry.position = self.queue_position(entry)
+        return entry
+
+    @staticmethod
+    def queue_position(entry):
+        if entry.promoted_at is not None:
+            return None
+        return WaitlistEntry.objects.waiting().filter(school=entry.school_id, pk__lte=entry.pk).count()
+
+    def perform_create(self, serializer):
+        school = get_object_or_404(School.objects.defer('search_vector'), pk=self.kwargs['school_pk'])
+        with transaction.atomic():
+            entry = serializer.save(school=school)
+            promoted = {promoted.pk: promoted for promoted in promote_waitlist([school.pk])}
+        serializer.instance = promoted.get(entry.pk, entry)
+        serializer.instance.position = self.queue_position(serializer.instance)
+
+    def perform_destroy(self, instance):
+        deleted, _ = WaitlistEntry.objects.waiting().filter(pk=instance.pk).delete()
+        if not deleted:
+            raise ValidationError(f'{instance} is already enrolled.')
+
+
+class SearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    ## Search
+    -----------------------
+    - Full text search
+        1. Method: **GET**
+        2. URL: api/search/?q=john
+        3. Query Parameters
+            - name: q
+                - type: string
+                - desc: Search terms
+            - name: type
+                - type: string
+                - desc: `students` (default) searches name, nationality and
+                  address; `schools` searches name, city and country.
+        4. Results are ranked best match first on PostgreSQL. Other
+           databases fall back to substring search.
+    """
+    filter_backends = (FullTextSearchFilter, )
+    search_targets = {
+        'students': (
+            Student.objects.defer('search_vector'),
+            StudentSerializer,
+            ('first_name', 'last_name', 'nationality', 'address'),
+        ),
+        'schools': (
+            School.objects.defer('search_vector'),
+            SchoolSerializer,
+            ('name', 'city', 'country'),
+        ),
+    }
+
+    def get_search_target(self):
+        target = self.request.query_params.get('type', 'students')
+        if target not in self.search_targets:
+            raise ValidationError({'type': [f'Expected one of: {", ".join(self.search_targets)}.']})
+        return self.search_targets[target]
+
+    @property
+    def search_fields(self):
+        return self.get_search_target()[2]
+
+    def get_queryset(self):
+        return self.get_search_target()[0].order_by('pk')
+
+    def get_serializer_class(self):
+        return self.get_search_target()[1]
+
+
+class ChangeFeedViewSet(viewsets.ViewSet):
+    """
+    ## Change feed
+    -----------------------
+    - Changes
+        1. Method: **GET**
+        2. URL: api/changes/?since={cursor}
+        3. Query Parameters
+            - name: since
+                - type: string
+                - desc: `cursor` of the previous response, omit it to
+                  read from the start of the log.
+            - name: limit
+                - type: integer
+                - desc: Changes per response, at most 500.
+            - name: wait
+                - type: float
+                - desc: Seconds to wait for a change when there is none
+                  yet (long-poll), at most 30. Only behind ASGI, unless
+                  `CHANGE_FEED_SYNC_LONG_POLL` is set.
+        4. Response: `changes` in commit order, each with the `model`
+           (`school` or `student`), `object_id`, `school`, `action`
+           (`create`, `update` or `delete`) and the `data` of the row after
+           a create or update, plus the `cursor` to send next and whether
+           `more` changes are ready. A school delete is preceded by the
+           deletes of its students.
+    """
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer, )
+
+    def list(self, request, *args, **kwargs):
+        """
+        A waiting request holds its worker until a change arrives, so `wait`
+        is ignored unless `CHANGE_FEED_SYNC_LONG_POLL` is set and there are
+        more workers than waiting clients. The database connection is given
+        back between polls.
+        """
+        since, limit, wait = parse_feed_params(request.query_params)
+        if not settings.CHANGE_FEED_SYNC_LONG_POLL:
+            wait = 0
+        deadline = time.monotonic() + wait
+        page = read_changes(since, limit)
+        with polling():
+            while not page['changes'] and time.monotonic() < deadline:
+                if not connection.in_atomic_block:
+                    connection.close()
+                time.sleep(min(settings.CHANGE_FEED_POLL_INTERVAL, deadline - time.monotonic()))
+                page = read_changes(since, limit)
+        return Response(page)
+
+
+def metrics_view(request):
+    """
+    Per-view request metrics of this process in the Prometheus text format,
+    only served with the `METRICS_TOKEN` bearer token or, without one, to
+    `METRICS_ALLOWED_IPS`.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected.encode()):
+            raise Http404
+    elif request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(metrics.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')